@@ -1,6 +1,9 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from .jobs import enqueue
+from .models import Category, Comment, Job, Location, Post
+from .pagination import EstimatedCountPaginator
+from .search import search_posts
 
 
 admin.site.empty_value_display = 'Не задано'
@@ -20,34 +23,92 @@ class LocationAdmin(admin.ModelAdmin):
     search_fields = ('name',)
 
 
-class PostAdmin(admin.ModelAdmin):
+class LargeTableAdmin(admin.ModelAdmin):
+    """Список без COUNT(*) и DISTINCT по датам по всей таблице."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/blog/large_change_list.html'
+
+
+class PostAdmin(LargeTableAdmin):
     list_display = (
         'title',
         'author',
+        'category',
         'pub_date',
         'is_published'
     )
+    list_select_related = (
+        'author',
+        'category'
+    )
     search_fields = (
         'title',
         'text'
     )
     list_filter = (
-        'pub_date',
-        'is_published'
+        'is_published',
+    )
+    date_hierarchy = 'pub_date'
+    ordering = ('-pub_date',)
+    autocomplete_fields = (
+        'author',
+        'category',
+        'location'
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Полнотекстовый индекс вместо LIKE '%...%' по всей таблице.
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            enqueue('blog.generate_image_derivatives', post_id=obj.pk)
+
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = (
         'text',
         'created_at',
-        'author'
+        'author',
+        'post'
+    )
+    list_select_related = (
+        'author',
+        'post'
     )
     search_fields = (
         'text',
     )
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    raw_id_fields = (
+        'post',
+        'author'
+    )
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'task',
+        'status',
+        'attempts',
+        'run_after',
+        'updated_at'
+    )
     list_filter = (
+        'status',
+        'task'
+    )
+    readonly_fields = (
+        'attempts',
+        'last_error',
         'created_at',
+        'updated_at'
     )
 
 
@@ -55,3 +116,4 @@ admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(Job, JobAdmin)
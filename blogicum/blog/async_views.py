@@ -0,0 +1,113 @@
+"""
+Асинхронные версии видов для чтения лент и страницы поста.
+
+Подключаются вместо синхронных настройкой BLOG_ASYNC_VIEWS и имеют
+смысл под ASGI (blogicum.asgi): синхронный вид там выполняется
+в отдельном потоке через sync_to_async. Шаблоны в асинхронном виде
+не могут обращаться к базе, поэтому все данные загружаются заранее:
+страница — списком, пользователь — через request.auser().
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.shortcuts import aget_object_or_404, render
+
+from .decorators import cache_for_anonymous, conditional_page, read_replica
+from .forms import CommentForm
+from .models import Category, Post
+from .utils import (
+    aget_comments_page,
+    aget_paginated_page,
+    aget_visible_post,
+    get_base_queryset,
+    get_comments_queryset,
+    get_feed_count_key,
+    get_post_last_modified,
+)
+
+
+@read_replica
+@conditional_page('index', scheduled=True)
+@cache_for_anonymous('index')
+async def index(request):
+    """Главная страница с списком всех публикаций."""
+    request.user = await request.auser()
+    page_obj = await aget_paginated_page(
+        request,
+        get_base_queryset(),
+        keyset=settings.BLOG_KEYSET_PAGINATION,
+        count_key=get_feed_count_key('index'),
+        estimated=settings.BLOG_ESTIMATED_FEED_COUNT,
+    )
+    return render(request, 'blog/index.html', {'page_obj': page_obj})
+
+
+@read_replica
+@conditional_page('post:{post_id}', last_modified=get_post_last_modified)
+@cache_for_anonymous('post:{post_id}')
+async def post_detail(request, post_id):
+    """Отображение полной информации из публикации."""
+    request.user = await request.auser()
+    post = await aget_visible_post(
+        request,
+        post_id,
+        Post.objects.select_related('author', 'category', 'location'),
+    )
+    context = {'post': post, 'form': CommentForm()}
+    if 'all_comments' in request.GET:
+        context['comments'] = [
+            comment async for comment in get_comments_queryset(post)
+        ]
+    else:
+        comments, has_more = await aget_comments_page(post)
+        context['comments'] = comments
+        context['comments_has_more'] = has_more
+    return render(request, 'blog/detail.html', context)
+
+
+@read_replica
+@conditional_page('category:{category_slug}', scheduled=True)
+@cache_for_anonymous('category:{category_slug}')
+async def category_posts(request, category_slug):
+    """Отображение всех публикаций определённой категории."""
+    request.user = await request.auser()
+    category = await aget_object_or_404(
+        Category,
+        slug=category_slug,
+        is_published=True
+    )
+    page_obj = await aget_paginated_page(
+        request,
+        get_base_queryset(manager=category.posts),
+        keyset=settings.BLOG_KEYSET_PAGINATION,
+        count_key=get_feed_count_key(f'category:{category.pk}'),
+    )
+    return render(
+        request,
+        'blog/category.html',
+        {'category': category, 'page_obj': page_obj}
+    )
+
+
+@read_replica
+@conditional_page('author:{username}', scheduled=True)
+async def profile_view(request, username):
+    """Профиль пользователя с подробной информацией."""
+    request.user = await request.auser()
+    profile = await aget_object_or_404(User, username=username)
+    is_owner = (request.user == profile)
+    page_obj = await aget_paginated_page(
+        request,
+        get_base_queryset(
+            manager=profile.posts,
+            filter_published=not is_owner,
+        ),
+        keyset=settings.BLOG_KEYSET_PAGINATION,
+        count_key=get_feed_count_key(
+            f'author:{profile.pk}',
+            scope='owner' if is_owner else 'public',
+        ),
+    )
+    return render(request, 'blog/profile.html', {
+        'profile': profile,
+        'page_obj': page_obj,
+    })
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды, кеш которых виден только одному процессу.
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Кеш по умолчанию должен быть общим для процессов сервера.
+
+    Сигналы сбрасывают страницы и счётчики сменой версий в кеше;
+    с кешем процесса сброс не дойдёт до остальных процессов.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        f'Кеш по умолчанию ({backend}) виден только одному процессу.',
+        hint='Используйте blogicum.settings_prod или задайте в CACHES '
+             'Redis, Memcached, DatabaseCache или FileBasedCache.',
+        id='blog.W001',
+    )]
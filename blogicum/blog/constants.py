@@ -3,3 +3,33 @@ POSTS_PER_PAGE = 10
 LIMIT_SYMBOLS_MAX = 30
 
 LIMIT_SYMBOLS = 27
+
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1280)
+
+IMAGE_DERIVATIVES_DIR = 'blog_images_resized'
+
+IMAGE_JPEG_QUALITY = 85
+
+IMAGE_WEBP_QUALITY = 80
+
+JOB_MAX_ATTEMPTS = 5
+
+JOB_RETRY_DELAY = 30
+
+JOB_STALE_TIMEOUT = 60 * 10
+
+COMMENTS_PER_PAGE = 50
+
+# Поиск: во сколько раз совпадение в заголовке весомее, чем в тексте,
+# и за сколько дней релевантность поста снижается вдвое.
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_RECENCY_DAYS = 365
+SEARCH_QUERY_MAX_LENGTH = 200
+
+# Начиная с этого количества строк пагинаторы показывают оценку
+# вместо точного COUNT(*).
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+# Сколько хранить в кеше отрисованную карточку поста; при изменении
+# поста меняется его версия (Post.card_version) и ключ кеша.
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
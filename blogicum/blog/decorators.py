@@ -0,0 +1,271 @@
+from functools import wraps
+from hashlib import md5
+from time import time
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .routers import (
+    get_replicas, is_pinned_to_primary, replica_reads, use_replicas
+)
+from .schedule import (
+    aget_cache_timeout, get_cache_timeout, get_next_pub_date
+)
+from .utils import get_bump_keys, get_cache_versions
+
+# Параметры запроса, которые меняют содержимое кешируемых страниц.
+PAGE_CACHE_QUERY_PARAMS = (
+    'page', 'cursor', 'all_comments', 'after', 'format'
+)
+
+
+def get_page_cache_key(request, groups):
+    query = '&'.join(
+        f'{name}={request.GET.get(name, "")}'
+        for name in PAGE_CACHE_QUERY_PARAMS
+    )
+    digest = md5(
+        f'{request.path}?{query}'.encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'blog:page:{digest}:{get_cache_versions(*groups)}'
+
+
+def get_page_groups(group_templates, kwargs):
+    return ['page'] + [
+        f'page:{template.format(**kwargs)}' for template in group_templates
+    ]
+
+
+def is_replica_lagging(groups):
+    """
+    Страница прочитана с реплики вскоре после сброса её кеша.
+
+    Реплика могла ещё не получить изменения, а сброс уже прошёл,
+    и устаревшая копия жила бы в кеше весь BLOG_PAGE_CACHE_TIMEOUT.
+    """
+    return (
+        replica_reads.get()
+        and bool(get_replicas())
+        and bool(cache.get_many(get_bump_keys(groups)))
+    )
+
+
+def is_page_cacheable(request, response, groups):
+    return (
+        response.status_code == 200
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        and not is_replica_lagging(groups)
+    )
+
+
+def get_page_cache_timeout():
+    return get_cache_timeout(settings.BLOG_PAGE_CACHE_TIMEOUT)
+
+
+def cache_for_anonymous(*group_templates):
+    """
+    Кеширует страницу целиком для анонимных посетителей.
+
+    Ключ строится из пути, номера страницы (или курсора) и версий групп
+    кеша: общей 'page' и перечисленных в group_templates, в которые
+    подставляются аргументы из URL, например 'post:{post_id}'.
+    Авторизованные пользователи и страницы с CSRF-формами не кешируются,
+    как и страницы, прочитанные с реплики сразу после сброса кеша.
+    Подходит и для асинхронных видов.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            return cache_async_view(view_func, group_templates)
+
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if (
+                request.method != 'GET'
+                or request.user.is_authenticated
+            ):
+                return view_func(request, *args, **kwargs)
+
+            groups = get_page_groups(group_templates, kwargs)
+            key = get_page_cache_key(request, groups)
+            response = cache.get(key)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+
+            def store(response):
+                if is_page_cacheable(request, response, groups):
+                    cache.set(key, response, get_page_cache_timeout())
+
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapped_view
+    return decorator
+
+
+def cache_async_view(view_func, group_templates):
+    """Вариант cache_for_anonymous для асинхронного вида."""
+    @wraps(view_func)
+    async def async_view(request, *args, **kwargs):
+        user = await request.auser()
+        if request.method != 'GET' or user.is_authenticated:
+            return await view_func(request, *args, **kwargs)
+        groups = get_page_groups(group_templates, kwargs)
+        key = get_page_cache_key(request, groups)
+        response = await cache.aget(key)
+        if response is None:
+            # Асинхронные виды возвращают готовый HttpResponse.
+            response = await view_func(request, *args, **kwargs)
+            if await sync_to_async(is_page_cacheable)(
+                request, response, groups
+            ):
+                await cache.aset(key, response, await aget_cache_timeout(
+                    settings.BLOG_PAGE_CACHE_TIMEOUT
+                ))
+        return response
+    return async_view
+
+
+def get_page_validators(
+    request, groups, kwargs, last_modified=None, scheduled=False
+):
+    """Возвращает (ETag, Last-Modified как timestamp или None)."""
+    modified = None
+    if last_modified is not None:
+        modified = last_modified(request, **kwargs)
+        if modified is not None:
+            modified = modified.timestamp()
+    next_pub_date = get_next_pub_date() if scheduled else None
+    # Секрет CSRF меняется при входе: страница с формой, отданная
+    # до входа, не должна подтверждаться ответом 304.
+    etag = md5(
+        f'{get_page_cache_key(request, groups)}:{request.user.pk}:'
+        f'{request.META.get("CSRF_COOKIE")}:{next_pub_date}:'
+        f'{modified}'.encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    # Last-Modified точен до секунды: изменение в ту же секунду,
+    # когда отдана страница, по If-Modified-Since было бы не видно.
+    if modified is not None:
+        modified = int(modified)
+        if modified >= int(time()):
+            modified = None
+    return quote_etag(etag), modified
+
+
+def set_page_validators(response, etag, modified):
+    # Заголовки перезаписываются: ответ из кеша cache_for_anonymous
+    # несёт ETag и Last-Modified посетителя, для которого отрисован.
+    if response.status_code == 200:
+        response.headers['ETag'] = etag
+        if modified is None:
+            response.headers.pop('Last-Modified', None)
+        else:
+            response.headers['Last-Modified'] = http_date(modified)
+    return response
+
+
+def conditional_page(*group_templates, last_modified=None, scheduled=False):
+    """
+    Отвечает 304 Not Modified, если страница у клиента не устарела.
+
+    ETag строится из ключа кеша страницы (как в cache_for_anonymous),
+    пользователя и секрета CSRF: версии групп кеша меняются при любом
+    изменении данных страницы, и ETag не требует запросов к базе. Для
+    лент (scheduled=True) в него входит и дата ближайшей отложенной
+    публикации: с её наступлением лента меняется. Необязательная
+    функция last_modified(request, **kwargs) возвращает datetime для
+    Last-Modified или None и должна быть дешёвой: она вызывается на
+    каждый запрос. Last-Modified не отдаётся, пока не прошла секунда
+    изменения. Шаблон при ответе 304 не рендерится. Подходит
+    и для асинхронных видов.
+    """
+    def get_validators(request, kwargs):
+        return get_page_validators(
+            request,
+            get_page_groups(group_templates, kwargs),
+            kwargs,
+            last_modified,
+            scheduled,
+        )
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            return conditional_async_view(view_func, get_validators)
+
+        @wraps(view_func)
+        def wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag, modified = get_validators(request, kwargs)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=modified
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return set_page_validators(response, etag, modified)
+        return wrapped_view
+    return decorator
+
+
+def conditional_async_view(view_func, get_validators):
+    """Вариант conditional_page для асинхронного вида."""
+    @wraps(view_func)
+    async def async_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await view_func(request, *args, **kwargs)
+        # Версии и пользователь читаются из кеша и базы синхронно.
+        etag, modified = await sync_to_async(get_validators)(
+            request, kwargs
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=modified
+        )
+        if response is None:
+            response = await view_func(request, *args, **kwargs)
+        return set_page_validators(response, etag, modified)
+    return async_view
+
+
+def read_replica(view_func):
+    """
+    Выполняет чтения вида на репликах (см. blog.routers.ReplicaRouter).
+
+    Пока сессия закреплена за основной базой после записи
+    (pin_to_primary), вид читает с основной. TemplateResponse
+    рендерится здесь же, чтобы ленивые запросы шаблона тоже ушли
+    на реплику. Подходит и для асинхронных видов: запросы ORM из
+    sync_to_async наследуют контекст.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_view(request, *args, **kwargs):
+            # Сессия загружается здесь, из основной базы.
+            await request.auser()
+            if request.method != 'GET' or is_pinned_to_primary(request):
+                return await view_func(request, *args, **kwargs)
+            with use_replicas():
+                return await view_func(request, *args, **kwargs)
+        return async_view
+
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        if request.method != 'GET' or is_pinned_to_primary(request):
+            return view_func(request, *args, **kwargs)
+        # Пользователь сессии загружается здесь, из основной базы:
+        # на реплике его может ещё не быть.
+        request.user.is_authenticated
+        with use_replicas():
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+    return wrapped_view
@@ -0,0 +1,124 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .constants import (
+    IMAGE_DERIVATIVE_WIDTHS,
+    IMAGE_DERIVATIVES_DIR,
+    IMAGE_JPEG_QUALITY,
+    IMAGE_WEBP_QUALITY,
+)
+from .models import Post
+
+
+def has_alpha(image):
+    return 'A' in image.getbands() or 'transparency' in image.info
+
+
+def render_variant(image, width, image_format):
+    """Уменьшает изображение до ширины width и кодирует в image_format."""
+    if width < image.width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    if image_format == 'WEBP':
+        image.save(buffer, 'WEBP', quality=IMAGE_WEBP_QUALITY, method=4)
+    elif image_format == 'PNG':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=IMAGE_JPEG_QUALITY, optimize=True,
+            progressive=True,
+        )
+    return buffer.getvalue()
+
+
+def delete_derivatives(storage, derivatives):
+    for variant in derivatives.get('files', []):
+        storage.delete(variant['name'])
+
+
+def generate_derivatives(post):
+    """
+    Создаёт уменьшенные копии и WebP-варианты фото публикации.
+
+    Копии шире оригинала не создаются; WebP делается и в исходной
+    ширине. Описание копий сохраняется в Post.image_derivatives
+    через UPDATE, без повторной отправки сигналов.
+
+    Returns:
+        Новое значение Post.image_derivatives.
+    """
+    storage = post.image.storage
+    delete_derivatives(storage, post.image_derivatives)
+    if not post.image:
+        derivatives = {}
+    else:
+        with post.image.open('rb') as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+        fallback = 'PNG' if has_alpha(image) else 'JPEG'
+        if fallback == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        stem = PurePosixPath(post.image.name).stem
+        widths = [w for w in IMAGE_DERIVATIVE_WIDTHS if w < image.width]
+        variants = [(width, fallback) for width in widths]
+        variants += [(width, 'WEBP') for width in widths + [image.width]]
+
+        files = []
+        for width, image_format in variants:
+            extension = 'jpg' if image_format == 'JPEG' else image_format
+            name = storage.save(
+                f'{IMAGE_DERIVATIVES_DIR}/{stem}_{width}w.'
+                f'{extension.lower()}',
+                ContentFile(render_variant(image, width, image_format)),
+            )
+            files.append({
+                'name': name,
+                'width': width,
+                'format': image_format.lower(),
+            })
+        derivatives = {
+            'source': post.image.name,
+            'width': image.width,
+            'files': files,
+        }
+
+    Post.objects.filter(pk=post.pk).update(
+        image_derivatives=derivatives,
+        updated_at=timezone.now(),
+    )
+    post.image_derivatives = derivatives
+    return derivatives
+
+
+def needs_derivatives(post):
+    source = post.image.name if post.image else None
+    return post.image_derivatives.get('source') != source
+
+
+def get_srcsets(post):
+    """
+    Возвращает srcset для WebP-источника и для запасного <img>.
+
+    Пока копии не созданы, запасной srcset пуст и браузер
+    загружает оригинал из src.
+    """
+    if not post.image or needs_derivatives(post):
+        return {'webp': '', 'fallback': ''}
+    storage = post.image.storage
+    srcsets = {'webp': [], 'fallback': []}
+    for variant in post.image_derivatives['files']:
+        kind = 'webp' if variant['format'] == 'webp' else 'fallback'
+        srcsets[kind].append(
+            f'{storage.url(variant["name"])} {variant["width"]}w'
+        )
+    srcsets['fallback'].append(
+        f'{post.image.url} {post.image_derivatives["width"]}w'
+    )
+    return {kind: ', '.join(items) for kind, items in srcsets.items()}
@@ -0,0 +1,142 @@
+import traceback
+from datetime import timedelta
+from uuid import uuid4
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .constants import JOB_RETRY_DELAY, JOB_STALE_TIMEOUT
+from .models import Job
+
+# Зарегистрированные задачи: имя -> функция.
+TASKS = {}
+
+
+def task(name):
+    """Регистрирует функцию как задачу очереди под именем name."""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(task_name, run_after=None, **payload):
+    """
+    Ставит задачу в очередь.
+
+    Args:
+        task_name: Имя задачи, зарегистрированной через @task.
+        run_after: Не выполнять раньше этого момента.
+        **payload: Аргументы задачи; должны сериализоваться в JSON.
+    """
+    if task_name not in TASKS:
+        raise KeyError(f'Неизвестная задача: {task_name}')
+    return Job.objects.create(
+        task=task_name,
+        payload=payload,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задачи, чей обработчик, видимо, упал."""
+    return Job.objects.filter(
+        status=Job.Status.RUNNING,
+        updated_at__lt=timezone.now() - timedelta(seconds=JOB_STALE_TIMEOUT),
+    ).update(status=Job.Status.PENDING)
+
+
+def claim_jobs(limit):
+    """
+    Забирает до limit готовых к выполнению задач.
+
+    На PostgreSQL использует SELECT ... FOR UPDATE SKIP LOCKED, на
+    остальных базах — один UPDATE с меткой партии, так что одну задачу
+    не заберут два обработчика.
+
+    Returns:
+        Список кортежей (id, задача, аргументы).
+    """
+    now = timezone.now()
+    pending = Job.objects.filter(
+        status=Job.Status.PENDING,
+        run_after__lte=now,
+    ).order_by('run_after')
+    claim_id = uuid4().hex
+    claim = {
+        'status': Job.Status.RUNNING,
+        'claim_id': claim_id,
+        'attempts': F('attempts') + 1,
+        'updated_at': now,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                pending.select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:limit]
+            )
+            Job.objects.filter(pk__in=ids).update(**claim)
+    else:
+        Job.objects.filter(
+            pk__in=pending.values('pk')[:limit],
+            status=Job.Status.PENDING,
+        ).update(**claim)
+    return list(
+        Job.objects.filter(claim_id=claim_id, status=Job.Status.RUNNING)
+        .values_list('pk', 'task', 'payload')
+    )
+
+
+def execute_job(job):
+    """
+    Выполняет задачу вне транзакции учёта очереди.
+
+    Args:
+        job: Кортеж (id, задача, аргументы) из claim_jobs.
+
+    Returns:
+        Пару (id, текст ошибки или None).
+    """
+    job_id, task_name, payload = job
+    try:
+        TASKS[task_name](**payload)
+    except Exception:
+        return job_id, traceback.format_exc()
+    return job_id, None
+
+
+def finish_jobs(results):
+    """
+    Записывает результаты выполнения задач.
+
+    Успешные задачи закрываются одним UPDATE; упавшие возвращаются
+    в очередь с экспоненциальной задержкой, пока не исчерпаны попытки.
+
+    Args:
+        results: Пары (id, текст ошибки или None) из execute_job.
+
+    Returns:
+        Список итоговых статусов.
+    """
+    now = timezone.now()
+    errors = dict(results)
+    done = [job_id for job_id, error in errors.items() if error is None]
+    Job.objects.filter(pk__in=done).update(
+        status=Job.Status.DONE, last_error='', updated_at=now
+    )
+    statuses = [Job.Status.DONE] * len(done)
+    for job in Job.objects.filter(pk__in=errors.keys() - set(done)):
+        job.last_error = errors[job.pk]
+        if job.attempts >= job.max_attempts:
+            job.status = Job.Status.FAILED
+        else:
+            job.status = Job.Status.PENDING
+            job.run_after = now + timedelta(
+                seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        job.save(
+            update_fields=['status', 'run_after', 'last_error', 'updated_at']
+        )
+        statuses.append(job.status)
+    return statuses
@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.images import generate_derivatives, needs_derivatives
+from blog.models import Post
+
+
+def process_post(post):
+    try:
+        return len(generate_derivatives(post).get('files', []))
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии и WebP-варианты для уже загруженных '
+        'фото публикаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество параллельных потоков обработки.',
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и для уже обработанных фото.',
+        )
+
+    def handle(self, *args, **options):
+        posts = [
+            post for post in Post.objects.exclude(image='').exclude(
+                image__isnull=True
+            ).only('id', 'image', 'image_derivatives').iterator()
+            if options['force'] or needs_derivatives(post)
+        ]
+        started = time.perf_counter()
+        processed = files = failed = 0
+        for post, result in self.run(posts, options['workers']):
+            if isinstance(result, Exception):
+                failed += 1
+                self.stderr.write(
+                    f'Публикация {post.pk} ({post.image.name}): {result}'
+                )
+            else:
+                files += result
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {processed}, создано файлов: {files}, '
+            f'ошибок: {failed} за {time.perf_counter() - started:.2f} с'
+        ))
+
+    def run(self, posts, workers):
+        """Возвращает пары (публикация, число файлов или исключение)."""
+        if workers <= 1:
+            for post in posts:
+                try:
+                    yield post, len(
+                        generate_derivatives(post).get('files', [])
+                    )
+                except Exception as error:
+                    yield post, error
+            return
+        # Pillow отпускает GIL при декодировании и масштабировании,
+        # поэтому потоков достаточно для параллельной обработки.
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_post, post): post for post in posts}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as error:
+                    yield futures[future], error
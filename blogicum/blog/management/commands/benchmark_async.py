@@ -0,0 +1,181 @@
+import asyncio
+import importlib
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client, RequestFactory, override_settings
+from django.urls import clear_url_caches
+
+from blog.urlbuilder import get_url_template
+
+from .benchmark_views import percentile
+
+
+def reload_urlconf():
+    """Перечитывает URL-схему после смены BLOG_ASYNC_VIEWS."""
+    importlib.reload(importlib.import_module('blog.urls'))
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+    get_url_template.cache_clear()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность синхронных видов под WSGI '
+        '(пул потоков) и асинхронных видов (BLOG_ASYNC_VIEWS) под ASGI '
+        'при одинаковом числе одновременных запросов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько запросов выполнить в каждом режиме.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=8,
+            help='Сколько запросов выполняется одновременно.',
+        )
+        parser.add_argument(
+            '--path', action='append',
+            help='Страница для замера; можно повторять. По умолчанию /.',
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.order_by('pk').first()
+        if user is None:
+            raise CommandError(
+                'Нет пользователей; сначала запустите seed_blog.'
+            )
+        # Страницы авторизованных пользователей не кешируются.
+        client = Client()
+        client.force_login(user)
+        self.cookie = '; '.join(
+            f'{name}={morsel.value}' for name, morsel in client.cookies.items()
+        )
+        modes = {
+            'wsgi_sync': (False, self.run_wsgi),
+            'asgi_async': (True, self.run_asgi),
+        }
+        results = {}
+        for path in options['path'] or ['/']:
+            for name, (async_views, run) in modes.items():
+                try:
+                    with override_settings(BLOG_ASYNC_VIEWS=async_views):
+                        reload_urlconf()
+                        results[name] = run(
+                            path, options['requests'],
+                            options['concurrency'],
+                        )
+                finally:
+                    # Вернуть виды из текущих настроек.
+                    reload_urlconf()
+                self.report(name, path, results[name])
+            change = (
+                results['asgi_async']['throughput_rps']
+                / results['wsgi_sync']['throughput_rps'] - 1
+            ) * 100
+            self.stdout.write(self.style.SUCCESS(
+                f'{path}: пропускная способность ASGI {change:+.0f}%'
+            ))
+
+    def run_wsgi(self, path, count, concurrency):
+        app = get_wsgi_application()
+        environ = RequestFactory().get(
+            path, HTTP_HOST='localhost', HTTP_COOKIE=self.cookie
+        ).environ
+        statuses = Counter()
+
+        def start_response(status, headers, exc_info=None):
+            statuses[int(status.split()[0])] += 1
+
+        def request(number):
+            started = time.perf_counter()
+            response = app(dict(environ), start_response)
+            b''.join(response)
+            response.close()
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            timings = list(executor.map(request, range(count)))
+        return self.summary(timings, time.perf_counter() - started, statuses)
+
+    def run_asgi(self, path, count, concurrency):
+        app = get_asgi_application()
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'root_path': '',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'cookie', self.cookie.encode()),
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+        }
+        statuses = Counter()
+
+        async def request(semaphore):
+            body_sent = False
+            disconnect = asyncio.Event()
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': b''}
+                # Клиент не отключается: Django сам отменит ожидание,
+                # когда ответ будет отправлен.
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses[message['status']] += 1
+
+            async with semaphore:
+                started = time.perf_counter()
+                await app(dict(scope), receive, send)
+                return (time.perf_counter() - started) * 1000
+
+        async def run():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(
+                *(request(semaphore) for _ in range(count))
+            )
+
+        started = time.perf_counter()
+        timings = asyncio.run(run())
+        return self.summary(timings, time.perf_counter() - started, statuses)
+
+    def summary(self, timings, elapsed, statuses):
+        return {
+            'requests': len(timings),
+            'statuses': dict(statuses),
+            'p50_ms': percentile(timings, 50),
+            'p99_ms': percentile(timings, 99),
+            'throughput_rps': len(timings) / elapsed,
+        }
+
+    def report(self, name, path, result):
+        self.stdout.write(
+            f'{name:<10} {path}: '
+            f'{result["throughput_rps"]:.0f} запр/с, '
+            f'p50 {result["p50_ms"]:.2f} мс, '
+            f'p99 {result["p99_ms"]:.2f} мс, '
+            f'статусы {result["statuses"]}'
+        )
@@ -0,0 +1,138 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.test import Client, RequestFactory
+
+from .benchmark_views import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку запросов, когда соединение с базой '
+        'открывается на каждый запрос (CONN_MAX_AGE=0), и с настройками '
+        'соединений из текущего профиля (постоянные соединения или пул).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=300,
+            help='Сколько запросов выполнить в каждом режиме.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=10,
+            help='Сколько запросов не учитывать в начале режима.',
+        )
+        parser.add_argument(
+            '--path', default='/pages/about/',
+            help='Страница для замера. По умолчанию — статичная: '
+                 'запросы к базе делают только сессия и пользователь, '
+                 'и цена соединения видна лучше всего.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.order_by('pk').first()
+        if user is None:
+            raise CommandError(
+                'Нет пользователей; сначала запустите seed_blog.'
+            )
+        # Страницы авторизованных пользователей не кешируются и всегда
+        # читают сессию и пользователя из базы.
+        client = Client()
+        client.force_login(user)
+        self.app = get_wsgi_application()
+        self.environ = RequestFactory().get(
+            options['path'],
+            HTTP_HOST='localhost',
+            HTTP_COOKIE='; '.join(
+                f'{name}={morsel.value}'
+                for name, morsel in client.cookies.items()
+            ),
+        ).environ
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        configured = (
+            settings_dict['CONN_MAX_AGE'],
+            settings_dict['OPTIONS'].get('pool'),
+        )
+        modes = {
+            'per_request': (0, None),
+            'configured': configured,
+        }
+        self.stdout.write(
+            f'{connection.vendor}: CONN_MAX_AGE={configured[0]}, '
+            f'pool={configured[1]!r}'
+        )
+        results = {}
+        try:
+            for name, (max_age, pool) in modes.items():
+                connection.close()
+                settings_dict['CONN_MAX_AGE'] = max_age
+                if pool is None:
+                    settings_dict['OPTIONS'].pop('pool', None)
+                else:
+                    settings_dict['OPTIONS']['pool'] = pool
+                results[name] = self.run_mode(
+                    connection, options['requests'], options['warmup']
+                )
+                self.report(name, results[name])
+        finally:
+            connection.close()
+            settings_dict['CONN_MAX_AGE'] = configured[0]
+            if configured[1] is not None:
+                settings_dict['OPTIONS']['pool'] = configured[1]
+        saved = (
+            results['per_request']['p50_ms']
+            - results['configured']['p50_ms']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Экономия на запрос (p50): {saved:.2f} мс'
+        ))
+
+    def run_mode(self, connection, count, warmup):
+        opened = 0
+        timings = []
+
+        def on_connect(sender, connection, **kwargs):
+            nonlocal opened
+            opened += 1
+
+        def start_response(status, headers, exc_info=None):
+            pass
+
+        connection_created.connect(on_connect)
+        try:
+            for number in range(warmup + count):
+                if number == warmup:
+                    opened = 0
+                started = time.perf_counter()
+                # Обработчик WSGI сам закрывает или сохраняет соединение
+                # по сигналам request_started и request_finished.
+                response = self.app(dict(self.environ), start_response)
+                b''.join(response)
+                response.close()
+                if number >= warmup:
+                    timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection_created.disconnect(on_connect)
+        return {
+            'p50_ms': percentile(timings, 50),
+            'p99_ms': percentile(timings, 99),
+            'mean_ms': statistics.fmean(timings),
+            'connections': opened,
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<11} p50 {result["p50_ms"]:.2f} мс, '
+            f'p99 {result["p99_ms"]:.2f} мс, '
+            f'среднее {result["mean_ms"]:.2f} мс, '
+            f'новых соединений: {result["connections"]}'
+        )
@@ -0,0 +1,125 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.constants import POSTS_PER_PAGE
+from blog.models import Category, Location, Post
+from blog.utils import get_base_queryset
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверяет, что запросы лент из get_base_queryset используют '
+        'индексы Post, и замеряет время первой страницы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=20000,
+            help='Сколько синтетических публикаций создать (0 — '
+                 'использовать данные из базы как есть).',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Сколько раз выполнить каждый запрос для замера.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['posts']:
+                author, category = self.seed(options['posts'])
+            else:
+                author = User.objects.order_by('pk').first()
+                category = Category.objects.order_by('pk').first()
+                if author is None or category is None:
+                    raise CommandError(
+                        'В базе нет данных; запустите с --posts.'
+                    )
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            # Для главной ленты при немногих категориях планировщик
+            # вправе обойти их и читать частичный индекс категории.
+            feeds = (
+                (
+                    'index',
+                    get_base_queryset(),
+                    ('post_published_feed_idx', 'post_category_feed_idx'),
+                ),
+                (
+                    'category',
+                    get_base_queryset(manager=category.posts),
+                    ('post_category_feed_idx',),
+                ),
+                (
+                    'profile',
+                    get_base_queryset(
+                        manager=author.posts, filter_published=False
+                    ),
+                    ('post_author_feed_idx',),
+                ),
+            )
+            missing = []
+            for name, queryset, index_names in feeds:
+                page = queryset[:POSTS_PER_PAGE]
+                plan = page.explain()
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    list(page.all())
+                    timings.append(time.perf_counter() - started)
+                used = [index for index in index_names if index in plan]
+                if not used:
+                    missing.append(name)
+                self.stdout.write(
+                    f'{name}: '
+                    f'{", ".join(used) if used else "индекс не используется"}'
+                    f', медиана {statistics.median(timings) * 1000:.2f} мс'
+                )
+                self.stdout.write(plan)
+            # Синтетические данные не должны остаться в базе.
+            transaction.set_rollback(True)
+
+        if missing:
+            raise CommandError(
+                'Планировщик не использует индекс для лент: '
+                + ', '.join(missing)
+            )
+
+    def seed(self, count):
+        now = timezone.now()
+        author = User.objects.create(username='benchmark-feed-author')
+        other = User.objects.create(username='benchmark-feed-other')
+        categories = Category.objects.bulk_create(
+            Category(
+                title=f'Категория {i}',
+                description='',
+                slug=f'benchmark-feed-{i}',
+                is_published=i != 0,
+            )
+            for i in range(10)
+        )
+        location = Location.objects.create(name='Benchmark')
+        Post.objects.bulk_create(
+            (
+                Post(
+                    title=f'Публикация {i}',
+                    text='',
+                    pub_date=now - timedelta(minutes=i - count // 100),
+                    author=author if i % 10 == 0 else other,
+                    category=categories[i % len(categories)],
+                    location=location,
+                    is_published=i % 7 != 0,
+                )
+                for i in range(count)
+            ),
+            batch_size=1000,
+        )
+        return author, categories[1]
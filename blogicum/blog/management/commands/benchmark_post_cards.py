@@ -0,0 +1,134 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Engine, engines
+
+from blog.constants import POSTS_PER_PAGE
+from blog.templatetags.blog_tags import get_post_card_key
+from blog.utils import get_base_queryset
+
+from .benchmark_views import percentile
+
+# Прежняя отрисовка ленты: {% include %} карточки на каждый пост,
+# внутри — {% cache %} и {% include %} ссылки на категорию.
+INCLUDE_TEMPLATES = {
+    'benchmark/feed.html': (
+        '{% for post in page_obj %}\n'
+        '    <article class="mb-5">\n'
+        '      {% include "benchmark/post_card.html" %}\n'
+        '    </article>\n'
+        '{% endfor %}'
+    ),
+    'benchmark/post_card.html': (
+        '{% load cache blog_tags %}'
+        '{% cache 86400 post_card post.id post.card_version %}'
+        '<div class="col d-flex justify-content-center">'
+        '<div class="card" style="width: 40rem;"><div class="card-body">'
+        '{% if post.image %}{% post_image post %}{% endif %}'
+        '<h5 class="card-title">{{ post.title }}</h5>'
+        '<h6 class="card-subtitle mb-2 text-muted"><small>'
+        '{% if not post.is_published %}'
+        '<p class="text-danger">Пост снят с публикации админом</p>'
+        '{% elif not post.category.is_published %}'
+        '<p class="text-danger">'
+        'Выбранная категория снята с публикации админом</p>'
+        '{% endif %}'
+        '{{ post.pub_date|date:"d E Y, H:i" }} | '
+        '{% if post.location and post.location.is_published %}'
+        '{{ post.location.name }}{% else %}Планета Земля{% endif %}<br>'
+        'От автора <a class="text-muted" '
+        'href="{% url \'blog:profile\' post.author.username %}">'
+        '@{{ post.author.username }}</a> в категории '
+        '{% include "includes/category_link.html" %}'
+        '</small></h6>'
+        '<p class="card-text">{{ post.text|truncatewords:10 }}</p>'
+        '<a href="{% url \'blog:post_detail\' post.id %}" '
+        'class="card-link">Читать полный текст</a>'
+        '<a href="{% url \'blog:post_detail\' post.id %}" '
+        'class="card-link text-muted">'
+        'Комментарии ({{ post.comment_count }})</a>'
+        '</div></div></div>'
+        '{% endcache %}'
+    ),
+    'benchmark/cards.html': '{% load blog_tags %}{% post_cards page_obj %}',
+}
+
+RENDERERS = {
+    'include': 'benchmark/feed.html',
+    'post_cards': 'benchmark/cards.html',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает отрисовку страницы карточек постов через {% include %} '
+        'на каждый пост и тегом {% post_cards %} за один проход, '
+        'с пустым и заполненным кешем карточек.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=500,
+            help='Сколько раз отрисовать страницу в каждом режиме.',
+        )
+
+    def handle(self, *args, **options):
+        posts = list(get_base_queryset()[:POSTS_PER_PAGE])
+        if not posts:
+            raise CommandError(
+                'Нет опубликованных постов; сначала запустите seed_blog.'
+            )
+        project_engine = engines['django'].engine
+        engine = Engine(
+            dirs=project_engine.dirs,
+            app_dirs=False,
+            libraries=project_engine.libraries,
+            loaders=[(
+                'django.template.loaders.cached.Loader', [
+                    ('django.template.loaders.locmem.Loader',
+                     INCLUDE_TEMPLATES),
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ],
+            )],
+        )
+        card_keys = [
+            key
+            for post in posts
+            for key in (
+                make_template_fragment_key(
+                    'post_card', [post.id, post.card_version]
+                ),
+                get_post_card_key(post),
+            )
+        ]
+        results = {}
+        for warm in (False, True):
+            for name, template_name in RENDERERS.items():
+                template = engine.get_template(template_name)
+                timings = []
+                cache.delete_many(card_keys)
+                for _ in range(options['iterations'] + 1):
+                    if not warm:
+                        cache.delete_many(card_keys)
+                    started = time.perf_counter()
+                    template.render(Context({'page_obj': posts}))
+                    timings.append((time.perf_counter() - started) * 1000)
+                # Первая отрисовка заполняет кеш карточек.
+                timings = timings[1:]
+                mode = f'{name}:{"warm" if warm else "cold"}'
+                results[mode] = percentile(timings, 50)
+                self.stdout.write(
+                    f'{mode:<16} p50 {results[mode]:.3f} мс, '
+                    f'среднее {statistics.fmean(timings):.3f} мс'
+                )
+        for state in ('cold', 'warm'):
+            ratio = (
+                results[f'include:{state}'] / results[f'post_cards:{state}']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{state}: post_cards быстрее в {ratio:.1f} раза'
+            ))
@@ -0,0 +1,96 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, engines
+from django.urls import reverse
+
+from blog.urlbuilder import build_url, get_url_builder
+
+# Ссылки карточки поста: профиль автора, категория и дважды пост.
+CARD_URLS = (
+    ('blog:profile', 'username'),
+    ('blog:category_posts', 'slug'),
+    ('blog:post_detail', 'pk'),
+    ('blog:post_detail', 'pk'),
+)
+
+CARD_TEMPLATE = (
+    '{{% load blog_tags %}}{{% for card in cards %}}'
+    '{{% {tag} "blog:profile" card.username %}}'
+    '{{% {tag} "blog:category_posts" card.slug %}}'
+    '{{% {tag} "blog:post_detail" card.pk %}}'
+    '{{% {tag} "blog:post_detail" card.pk %}}'
+    '{{% endfor %}}'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает reverse() и {% url %} со сборкой URL без резолвера '
+        '(blog.urlbuilder) на ссылках карточек постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cards', type=int, default=10_000,
+            help='Сколько карточек (по четыре ссылки) собрать.',
+        )
+
+    def handle(self, *args, **options):
+        # Значения не берутся из базы: замеряется только сборка URL.
+        cards = [
+            {
+                'pk': number,
+                'username': f'author{number % 500}',
+                'slug': f'category-{number % 20}',
+            }
+            for number in range(1, options['cards'] + 1)
+        ]
+        # Сборщики создаются один раз на страницу, как в {% post_cards %}.
+        builders = {
+            viewname: get_url_builder(viewname) for viewname, _ in CARD_URLS
+        }
+        timings = {
+            'reverse': self.measure(lambda: [
+                reverse(viewname, args=[card[field]])
+                for card in cards
+                for viewname, field in CARD_URLS
+            ]),
+            'build_url': self.measure(lambda: [
+                build_url(viewname, card[field])
+                for card in cards
+                for viewname, field in CARD_URLS
+            ]),
+            'get_url_builder': self.measure(lambda: [
+                builders[viewname](card[field])
+                for card in cards
+                for viewname, field in CARD_URLS
+            ]),
+        }
+        engine = engines['django']
+        context = Context({'cards': cards})
+        for tag in ('url', 'build_url'):
+            template = engine.from_string(
+                CARD_TEMPLATE.format(tag=tag)
+            ).template
+            timings[f'{{% {tag} %}}'] = self.measure(
+                lambda: template.render(context)
+            )
+        for name, elapsed in timings.items():
+            self.stdout.write(
+                f'{name:<15} {elapsed * 1000:8.1f} мс, '
+                f'{elapsed / len(cards) * 1e6:6.1f} мкс на карточку'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'get_url_builder быстрее reverse в '
+            f'{timings["reverse"] / timings["get_url_builder"]:.1f} раза, '
+            f'в шаблоне — в '
+            f'{timings["{% url %}"] / timings["{% build_url %}"]:.1f} раза'
+        ))
+
+    def measure(self, run):
+        # Первый прогон заполняет кеши резолвера и шаблонов URL.
+        run()
+        started = time.perf_counter()
+        run()
+        return time.perf_counter() - started
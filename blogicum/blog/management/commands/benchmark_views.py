@@ -0,0 +1,254 @@
+import json
+import statistics
+import subprocess
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.core.wsgi import get_wsgi_application
+from django.db import close_old_connections, connection, transaction
+from django.test import Client, RequestFactory
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from blog.models import Comment, Post
+from blog.performance import measure
+
+User = get_user_model()
+
+SCENARIOS = (
+    'index', 'category', 'profile', 'detail', 'comment',
+    'admin_posts', 'admin_comments',
+)
+
+# Сценарии, которым нужен доступ в админку.
+ADMIN_SCENARIOS = {'admin_posts', 'admin_comments'}
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(timings, percent):
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=100)[percent - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и пропускную способность основных видов через '
+        'WSGI-приложение и сохраняет результат в JSON для сравнения '
+        'между коммитами. Данные для замера создаёт seed_blog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=200,
+            help='Сколько запросов выполнить в каждом сценарии.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=10,
+            help='Сколько запросов не учитывать в начале сценария.',
+        )
+        parser.add_argument(
+            '--scenario', action='append', choices=SCENARIOS,
+            help='Запустить только этот сценарий; можно повторять.',
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Запросы от анонима (с кешем страниц), а не от '
+                 'авторизованного пользователя.',
+        )
+        parser.add_argument(
+            '--output', type=Path,
+            help='Сохранить результаты в этот JSON-файл.',
+        )
+        parser.add_argument(
+            '--compare', type=Path,
+            help='Сравнить с результатами из этого JSON-файла.',
+        )
+
+    def handle(self, *args, **options):
+        post = (
+            Post.objects.filter(
+                is_published=True,
+                category__is_published=True,
+                pub_date__lte=timezone.now(),
+            )
+            .order_by('-comment_count', 'pk')
+            .select_related('author', 'category')
+            .first()
+        )
+        if post is None:
+            raise CommandError(
+                'Нет опубликованных постов; сначала запустите seed_blog.'
+            )
+        self.app = get_wsgi_application()
+        self.factory = RequestFactory()
+        self.cookies = {}
+        if not options['anonymous']:
+            self.login(post.author)
+
+        targets = {
+            'index': ('get', '/'),
+            'category': ('get', f'/category/{post.category.slug}/'),
+            'profile': ('get', f'/profile/{post.author.username}/'),
+            'detail': ('get', f'/posts/{post.pk}/'),
+            'comment': ('post', f'/posts/{post.pk}/comment/'),
+            'admin_posts': ('get', '/admin/blog/post/'),
+            'admin_comments': ('get', '/admin/blog/comment/'),
+        }
+        results = {}
+        # Как и тестовый клиент, не закрываем соединение после каждого
+        # запроса: замеры идут в транзакции, которая затем откатывается,
+        # чтобы созданные комментарии не остались в базе.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            for name in options['scenario'] or SCENARIOS:
+                if options['anonymous'] and (
+                    name == 'comment' or name in ADMIN_SCENARIOS
+                ):
+                    continue
+                method, path = targets[name]
+                with transaction.atomic():
+                    if name in ADMIN_SCENARIOS:
+                        # Права выдаются только внутри откатываемой
+                        # транзакции замера.
+                        User.objects.filter(pk=post.author_id).update(
+                            is_staff=True, is_superuser=True
+                        )
+                    results[name] = self.run_scenario(
+                        method, path, options['requests'], options['warmup']
+                    )
+                    transaction.set_rollback(True)
+                self.report(name, path, results[name])
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        data = {
+            'commit': get_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'anonymous': options['anonymous'],
+            'dataset': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+            },
+            'scenarios': results,
+        }
+        if options['output']:
+            options['output'].write_text(
+                json.dumps(data, ensure_ascii=False, indent=2),
+                encoding='utf-8',
+            )
+            self.stdout.write(f'Результаты записаны в {options["output"]}')
+        if options['compare']:
+            self.compare(
+                json.loads(options['compare'].read_text(encoding='utf-8')),
+                data,
+            )
+
+    def login(self, user):
+        client = Client()
+        client.force_login(user)
+        self.cookies = {
+            name: morsel.value for name, morsel in client.cookies.items()
+        }
+        # Начиная с Django 4.1 в cookie хранится немаскированный секрет,
+        # его же принимает заголовок X-CSRFToken.
+        self.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(32)
+
+    def build_environ(self, method, path, number):
+        extra = {
+            'HTTP_HOST': 'localhost',
+            'HTTP_COOKIE': '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            ),
+        }
+        if method == 'post':
+            extra['HTTP_X_CSRFTOKEN'] = self.cookies.get(
+                settings.CSRF_COOKIE_NAME, ''
+            )
+            request = self.factory.post(
+                path, {'text': f'Комментарий для замера {number}'}, **extra
+            )
+        else:
+            request = self.factory.get(path, **extra)
+        return request.environ
+
+    def run_scenario(self, method, path, count, warmup):
+        statuses = Counter()
+        timings = []
+        queries = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses[int(status.split()[0])] += 1
+
+        for number in range(warmup + count):
+            environ = self.build_environ(method, path, number)
+            with measure() as metrics:
+                started = time.perf_counter()
+                response = self.app(environ, start_response)
+                b''.join(response)
+                response.close()
+                elapsed = time.perf_counter() - started
+            if number >= warmup:
+                timings.append(elapsed * 1000)
+                queries.append(metrics.queries)
+        return {
+            'path': path,
+            'method': method.upper(),
+            'requests': count,
+            'statuses': {
+                str(status): total for status, total in statuses.items()
+            },
+            'p50_ms': percentile(timings, 50),
+            'p90_ms': percentile(timings, 90),
+            'p99_ms': percentile(timings, 99),
+            'mean_ms': statistics.fmean(timings),
+            'max_ms': max(timings),
+            'throughput_rps': len(timings) / (sum(timings) / 1000),
+            'queries': statistics.fmean(queries),
+        }
+
+    def report(self, name, path, result):
+        self.stdout.write(
+            f'{name:<9} {result["method"]:<4} {path}: '
+            f'p50 {result["p50_ms"]:.2f} мс, '
+            f'p99 {result["p99_ms"]:.2f} мс, '
+            f'{result["throughput_rps"]:.0f} запр/с, '
+            f'{result["queries"]:.1f} SQL, '
+            f'статусы {result["statuses"]}'
+        )
+
+    def compare(self, before, after):
+        self.stdout.write(
+            f'Сравнение {before.get("commit")} -> {after.get("commit")}:'
+        )
+        for name, result in after['scenarios'].items():
+            previous = before['scenarios'].get(name)
+            if previous is None:
+                continue
+            changes = ', '.join(
+                f'{metric} {previous[metric]:.2f} -> {result[metric]:.2f} '
+                f'({(result[metric] / previous[metric] - 1) * 100:+.0f}%)'
+                if previous[metric] else
+                f'{metric} {previous[metric]:.2f} -> {result[metric]:.2f}'
+                for metric in ('p50_ms', 'p99_ms', 'queries')
+            )
+            self.stdout.write(f'{name:<9} {changes}')
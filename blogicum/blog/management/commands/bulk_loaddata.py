@@ -0,0 +1,247 @@
+import gzip
+import json
+import re
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from blog.models import Post
+from blog.schedule import refresh_next_pub_date
+from blog.search import rebuild_index
+from blog.utils import (
+    invalidate_feed_counts, invalidate_pages, update_comment_counts
+)
+
+# Сколько символов читать из файла за раз.
+READ_SIZE = 1 << 20
+
+decoder = json.JSONDecoder()
+
+# Пробелы и запятые между объектами массива.
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_fixture(stream):
+    """
+    Потоково разбирает JSON-массив фикстуры, не загружая его целиком.
+
+    Yields:
+        Словари объектов фикстуры по одному.
+    """
+    buffer = stream.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Фикстура должна быть JSON-массивом.')
+    position = 1
+    while True:
+        position = SEPARATORS.match(buffer, position).end()
+        if position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Объект не поместился в буфер: дочитываем.
+                pass
+            else:
+                yield obj
+                continue
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            if position < len(buffer):
+                raise CommandError('Фикстура обрывается на середине.')
+            return
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def get_dependencies(model):
+    return {
+        field.related_model
+        for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model is not model
+    }
+
+
+@contextmanager
+def raw_timestamps(models):
+    """
+    Отключает auto_now и auto_now_add, чтобы сохранить даты из фикстуры.
+
+    bulk_create, в отличие от save(raw=True) в loaddata, перезаписал бы
+    их текущим временем.
+    """
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            flags = (
+                getattr(field, 'auto_now', False),
+                getattr(field, 'auto_now_add', False),
+            )
+            if any(flags):
+                changed.append((field, flags))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield [field for field, _ in changed]
+    finally:
+        for field, (auto_now, auto_now_add) in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Loader:
+    """Копит объекты по моделям и вставляет их пачками."""
+
+    def __init__(self, using, batch_size):
+        self.using = using
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.counts = defaultdict(int)
+        self.timestamp_fields = []
+        self.now = timezone.now()
+
+    def add(self, raw):
+        try:
+            model = apps.get_model(raw['model'])
+        except (LookupError, KeyError, TypeError) as error:
+            raise CommandError(f'Неизвестная модель: {error}')
+        self.pending[model].append(raw)
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model, visiting=()):
+        """Вставляет накопленное для model, начиная с родителей по FK."""
+        for parent in get_dependencies(model):
+            if self.pending.get(parent) and parent not in visiting:
+                self.flush(parent, visiting + (model,))
+        raws = self.pending.pop(model, None)
+        if not raws:
+            return
+        objects = []
+        m2m = []
+        for deserialized in serializers.deserialize(
+            'python', raws, using=self.using, ignorenonexistent=True,
+        ):
+            obj = deserialized.object
+            for field in self.timestamp_fields:
+                if field.model is model and getattr(
+                    obj, field.attname
+                ) is None:
+                    # Поле появилось после выгрузки фикстуры.
+                    setattr(obj, field.attname, self.now)
+            objects.append(obj)
+            if deserialized.m2m_data:
+                m2m.append((obj, deserialized.m2m_data))
+        opts = model._meta
+        model._base_manager.using(self.using).bulk_create(
+            objects,
+            batch_size=self.batch_size,
+            # Как и loaddata, перезаписываем уже существующие строки.
+            update_conflicts=True,
+            unique_fields=[opts.pk.name],
+            update_fields=[
+                field.name for field in opts.concrete_fields
+                if not field.primary_key
+            ],
+        )
+        self.counts[model] += len(objects)
+        if m2m:
+            self.add_m2m(model, m2m)
+
+    def add_m2m(self, model, m2m):
+        """Вставляет связи многие-ко-многим одной пачкой на поле."""
+        rows = defaultdict(list)
+        for obj, m2m_data in m2m:
+            for name, related_ids in m2m_data.items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                source = through._meta.get_field(
+                    field.m2m_field_name()
+                ).attname
+                target = through._meta.get_field(
+                    field.m2m_reverse_field_name()
+                ).attname
+                rows[through].extend(
+                    through(**{source: obj.pk, target: related_id})
+                    for related_id in related_ids
+                )
+        for through, objects in rows.items():
+            through._base_manager.using(self.using).bulk_create(
+                objects, batch_size=self.batch_size, ignore_conflicts=True,
+            )
+
+    def flush_all(self):
+        while self.pending:
+            self.flush(next(iter(self.pending)))
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстрая альтернатива loaddata для больших JSON-фикстур: '
+        'потоковый разбор и bulk_create пачками без сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'fixtures', nargs='+',
+            help='Пути к JSON-фикстурам (можно .json.gz).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Сколько объектов одной модели вставлять за раз.',
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        connection = connections[using]
+        loader = Loader(using, options['batch_size'])
+        started = time.perf_counter()
+        models = apps.get_models()
+        with ExitStack() as stack:
+            stack.enter_context(transaction.atomic(using=using))
+            stack.enter_context(connection.constraint_checks_disabled())
+            timestamp_fields = stack.enter_context(raw_timestamps(models))
+            loader.timestamp_fields = timestamp_fields
+            for path in options['fixtures']:
+                opener = gzip.open if path.endswith('.gz') else open
+                with opener(path, 'rt', encoding='utf-8') as stream:
+                    for raw in iter_fixture(stream):
+                        loader.add(raw)
+            loader.flush_all()
+            loaded = list(loader.counts)
+            # Ссылки на объекты, идущие в фикстуре позже, проверяются
+            # один раз в конце, как в loaddata.
+            connection.check_constraints(
+                table_names=[model._meta.db_table for model in loaded]
+            )
+            sequence_sql = connection.ops.sequence_reset_sql(
+                no_style(), loaded
+            )
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for sql in sequence_sql:
+                        cursor.execute(sql)
+            # Сигналы не отправлялись: счётчики, поисковый индекс
+            # и кеш обновляем сами.
+            update_comment_counts()
+            if Post in loader.counts:
+                rebuild_index()
+        refresh_next_pub_date()
+        invalidate_feed_counts()
+        invalidate_pages()
+
+        elapsed = time.perf_counter() - started
+        total = sum(loader.counts.values())
+        for model, count in loader.counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с)'
+        ))
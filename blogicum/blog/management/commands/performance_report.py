@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from blog.performance import METRICS, get_report, reset_report
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит сводку PerformanceMiddleware: запросы к БД, время и '
+        'размер ответов по видам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sort', choices=list(METRICS), default='total_time',
+            help='Метрика, по среднему значению которой сортировать.',
+        )
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Очистить накопленную сводку после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        report = get_report(sort=options['sort'])
+        if not report:
+            self.stdout.write('Замеров нет: включите '
+                              'BLOG_PERFORMANCE_MONITORING.')
+        else:
+            width = max(len(row['view']) for row in report)
+            self.stdout.write(
+                f'{"Вид":<{width}} {"Запросов":>8} {"Сверх":>6} '
+                + ' '.join(f'{name:>21}' for name in METRICS)
+            )
+            for row in report:
+                line = (
+                    f'{row["view"]:<{width}} {row["count"]:>8} '
+                    f'{row["over_budget"]:>6} '
+                )
+                line += ' '.join(
+                    f'{row[name + "_avg"]:>10.1f}/{row[name + "_max"]:<10.1f}'
+                    for name in METRICS
+                )
+                self.stdout.write(line)
+            self.stdout.write('Значения: среднее/максимум.')
+        if options['reset']:
+            reset_report()
+            self.stdout.write(self.style.SUCCESS('Сводка очищена.'))
@@ -0,0 +1,82 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from blog.performance import install_template_timer, measure
+
+
+class Command(BaseCommand):
+    help = (
+        'Профилирует рендеринг страницы: время и число вызовов каждого '
+        'шаблона, включая {% include %} и inclusion-теги, в среднем '
+        'на запрос.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='По скольким запросам усреднять.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Сколько запросов не учитывать: первые заполняют кеши '
+                 'загрузчика шаблонов и карточек постов.',
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='Запросы от анонима; страница из кеша не рендерится.',
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        if not options['anonymous']:
+            user = get_user_model().objects.order_by('pk').first()
+            if user is None:
+                raise CommandError(
+                    'Нет пользователей; сначала запустите seed_blog.'
+                )
+            client.force_login(user)
+        install_template_timer()
+        templates = defaultdict(lambda: [0, 0.0, 0.0])
+        render_time = 0.0
+        count = options['requests']
+        for number in range(options['warmup'] + count):
+            with measure() as metrics:
+                response = client.get(options['path'])
+            if response.status_code != 200:
+                raise CommandError(
+                    f'{options["path"]} вернул {response.status_code}.'
+                )
+            if number < options['warmup']:
+                continue
+            render_time += metrics.render_time
+            for name, calls, total, own in metrics.template_profile():
+                stats = templates[name]
+                stats[0] += calls
+                stats[1] += total
+                stats[2] += own
+
+        if not templates:
+            self.stdout.write('Шаблоны не рендерились.')
+            return
+        width = max(len(name) for name in templates)
+        self.stdout.write(
+            f'{"Шаблон":<{width}} {"Вызовов":>8} {"Всего, мс":>10} '
+            f'{"Своё, мс":>10} {"Доля":>6}'
+        )
+        for name, (calls, total, own) in sorted(
+            templates.items(), key=lambda item: item[1][2], reverse=True
+        ):
+            self.stdout.write(
+                f'{name:<{width}} {calls / count:>8.1f} '
+                f'{total / count * 1000:>10.2f} '
+                f'{own / count * 1000:>10.2f} '
+                f'{own / render_time:>6.0%}'
+            )
+        self.stdout.write(
+            f'Рендеринг страницы: {render_time / count * 1000:.2f} мс '
+            f'в среднем за {count} запросов.'
+        )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index, uses_fts
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново строит поисковый индекс FTS5 по всем публикациям '
+        '(на PostgreSQL индекс обновляется базой сам).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько публикаций индексировать за раз.',
+        )
+
+    def handle(self, *args, **options):
+        if not uses_fts():
+            self.stdout.write('Индекс строится базой данных, делать нечего.')
+            return
+        started = time.perf_counter()
+        total = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано публикаций: {total} '
+            f'за {time.perf_counter() - started:.2f} с'
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.utils import update_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Ширина диапазона id публикаций в одном UPDATE.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        repaired = update_comment_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счётчиков: {repaired} '
+            f'за {time.perf_counter() - started:.2f} с'
+        ))
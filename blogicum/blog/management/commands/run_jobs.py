@@ -0,0 +1,111 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.jobs import (
+    claim_jobs, execute_job, finish_jobs, requeue_stale_jobs
+)
+from blog.models import Job
+
+
+def execute_job_in_worker(job):
+    try:
+        return execute_job(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        'Обработчик очереди фоновых задач: забирает задачи из базы и '
+        'выполняет их в пуле процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Размер пула процессов; 0 — выполнять в этом процессе.',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=None,
+            help='Сколько задач забирать за раз (по умолчанию 10 на '
+                 'процесс).',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунд.',
+        )
+        parser.add_argument(
+            '--benchmark', type=int, default=0, metavar='N',
+            help='Поставить N пустых задач, выполнить их и вывести '
+                 'пропускную способность.',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch = options['batch'] or max(1, workers) * 10
+        if options['benchmark']:
+            Job.objects.bulk_create(
+                Job(task='blog.noop', payload={'n': n})
+                for n in range(options['benchmark'])
+            )
+            options['burst'] = True
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(
+                f'Возвращено в очередь зависших задач: {requeued}'
+            )
+
+        pool = None
+        if workers > 0:
+            # ProcessPoolExecutor запускает процессы при первой задаче,
+            # когда у родителя уже открыто соединение. При fork они
+            # унаследовали бы его сокет, и закрытие в дочернем процессе
+            # (в PostgreSQL — с сообщением Terminate) оборвало бы сессию
+            # родителя. spawn не передаёт дочерним процессам ничего,
+            # а инициализатор — сам django.setup(): модуль команды
+            # импортирует модели и до настройки не загрузится.
+            pool = ProcessPoolExecutor(
+                workers,
+                mp_context=get_context('spawn'),
+                initializer=django.setup,
+            )
+        statuses = Counter()
+        started = time.perf_counter()
+        try:
+            while True:
+                jobs = claim_jobs(batch)
+                if not jobs:
+                    if options['burst']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                if pool is None:
+                    results = [execute_job(job) for job in jobs]
+                else:
+                    results = pool.map(execute_job_in_worker, jobs)
+                statuses.update(finish_jobs(results))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed = time.perf_counter() - started
+        total = sum(statuses.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {total} за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else 0:.1f} задач/с); '
+            + ', '.join(
+                f'{status}: {count}' for status, count in statuses.items()
+            )
+        ))
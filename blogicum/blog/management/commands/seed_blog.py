@@ -0,0 +1,190 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+from blog.schedule import refresh_next_pub_date
+from blog.search import rebuild_index
+from blog.utils import (
+    invalidate_feed_counts, invalidate_pages, update_comment_counts
+)
+
+User = get_user_model()
+
+# Сколько разных текстов сгенерировать через Faker; дальше они
+# переиспользуются, иначе генерация текста дольше вставки в базу.
+TEXT_POOL_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, публикациями и '
+        'комментариями для нагрузочных замеров. При одинаковом --seed '
+        'данные одинаковые.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=10_000_000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Размер пачки bulk_create.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Зерно генератора случайных чисел.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        self.titles = [
+            fake.sentence(nb_words=5)[:256] for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.texts = [
+            fake.paragraph(nb_sentences=5) for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.now = timezone.now()
+        # Префикс отделяет данные разных запусков с другим зерном.
+        self.prefix = f'seed{options["seed"]}'
+
+        started = time.perf_counter()
+        # Хеш считается один раз: PBKDF2 для каждого из 100 тыс.
+        # пользователей занял бы минуты.
+        password = make_password('benchmark')
+        user_ids = self.create(
+            User,
+            (
+                User(
+                    username=f'{self.prefix}_user{n}',
+                    first_name=fake.first_name(),
+                    last_name=fake.last_name(),
+                    password=password,
+                )
+                for n in range(options['users'])
+            ),
+        )
+        category_ids = self.create(
+            Category,
+            (
+                Category(
+                    title=self.rng.choice(self.titles)[:256],
+                    description=self.rng.choice(self.texts),
+                    slug=f'{self.prefix}-category-{n}',
+                    # Каждая десятая категория скрыта.
+                    is_published=n % 10 != 9,
+                )
+                for n in range(options['categories'])
+            ),
+        )
+        location_ids = self.create(
+            Location,
+            (
+                Location(name=fake.city(), is_published=True)
+                for _ in range(options['locations'])
+            ),
+        )
+        post_ids = self.create(
+            Post,
+            (
+                self.make_post(user_ids, category_ids, location_ids)
+                for _ in range(options['posts'])
+            ),
+        )
+        self.create(
+            Comment,
+            (
+                Comment(
+                    text=self.rng.choice(self.texts),
+                    post_id=self.pick_post(post_ids),
+                    author_id=self.rng.choice(user_ids),
+                )
+                for _ in range(options['comments'])
+            ),
+            keep_ids=False,
+        )
+
+        self.stdout.write('Пересчёт Post.comment_count...')
+        update_comment_counts()
+        self.stdout.write('Построение поискового индекса...')
+        rebuild_index()
+        # Статистика для планировщика и оценок числа строк
+        # в EstimatedCountPaginator.
+        self.stdout.write('Сбор статистики (ANALYZE)...')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        refresh_next_pub_date()
+        invalidate_feed_counts()
+        invalidate_pages()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def make_post(self, user_ids, category_ids, location_ids):
+        # Публикации за три года; около 1% отложено на будущее.
+        pub_date = self.now - timedelta(
+            minutes=self.rng.randint(-60 * 24 * 10, 60 * 24 * 365 * 3)
+        )
+        return Post(
+            title=self.rng.choice(self.titles),
+            text=self.rng.choice(self.texts),
+            pub_date=pub_date,
+            # Немногие активные авторы пишут большую часть постов.
+            author_id=user_ids[int(len(user_ids) * self.rng.random() ** 3)],
+            category_id=self.rng.choice(category_ids),
+            location_id=(
+                self.rng.choice(location_ids)
+                if location_ids and self.rng.random() < 0.7 else None
+            ),
+            is_published=self.rng.random() < 0.95,
+        )
+
+    def pick_post(self, post_ids):
+        # Обсуждения сосредоточены на небольшой доле публикаций.
+        return post_ids[int(len(post_ids) * self.rng.random() ** 4)]
+
+    def create(self, model, objects, keep_ids=True):
+        """
+        Вставляет объекты пачками и печатает скорость.
+
+        Returns:
+            Список id созданных объектов (пустой при keep_ids=False).
+        """
+        name = model._meta.verbose_name_plural
+        started = time.perf_counter()
+        ids = []
+        batch = []
+        total = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                total += self.flush(model, batch, ids, keep_ids)
+        total += self.flush(model, batch, ids, keep_ids)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с)'
+        )
+        return ids
+
+    def flush(self, model, batch, ids, keep_ids):
+        if not batch:
+            return 0
+        created = model.objects.bulk_create(batch)
+        if keep_ids:
+            ids.extend(obj.pk for obj in created)
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,98 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .performance import (
+    check_budget,
+    install_template_timer,
+    log_template_profile,
+    measure,
+    record,
+)
+from .routers import get_replicas, pin_to_primary
+
+
+class PerformanceMiddleware:
+    """
+    Замеряет запросы к видам и копит сводку по именам URL.
+
+    Включается настройкой BLOG_PERFORMANCE_MONITORING. Для каждого
+    запроса считаются SQL-запросы и их время, время рендеринга
+    шаблонов, общее время и размер ответа; превышения
+    BLOG_PERFORMANCE_BUDGETS пишутся в лог blog.performance,
+    а на уровне DEBUG — и время каждого шаблона.
+    """
+
+    def __init__(self, get_response):
+        if not settings.BLOG_PERFORMANCE_MONITORING:
+            raise MiddlewareNotUsed
+        install_template_timer()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with measure() as metrics:
+            response = self.get_response(request)
+        match = request.resolver_match
+        if match is None or not match.view_name:
+            return response
+        sample = {
+            'queries': metrics.queries,
+            'sql_time': metrics.sql_time * 1000,
+            'render_time': metrics.render_time * 1000,
+            'total_time': (time.perf_counter() - started) * 1000,
+            'size': (
+                0 if response.streaming else len(response.content)
+            ),
+        }
+        sample['violations'] = check_budget(match.view_name, sample)
+        log_template_profile(match.view_name, metrics)
+        record(match.view_name, sample)
+        return response
+
+
+class PrimaryPinMiddleware:
+    """
+    После успешной записи закрепляет сессию за основной базой.
+
+    Так автор сразу видит свой пост или комментарий, даже если реплика
+    ещё не догнала основную базу. Без реплик ничего не делает.
+    Поддерживает ASGI, чтобы асинхронные виды не уходили в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if (
+            self.is_write(request, response)
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if (
+            self.is_write(request, response)
+            and (await request.auser()).is_authenticated
+        ):
+            pin_to_primary(request)
+        return response
+
+    def is_write(self, request, response):
+        return (
+            get_replicas()
+            and request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and response.status_code < 400
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Заполняется автоматически после загрузки фото.', verbose_name='Уменьшенные копии фото'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+import re
+from functools import lru_cache
+
+import snowballstemmer
+from django.db import migrations
+
+# Копия blog.search на момент миграции: её результат не должен
+# зависеть от последующих правок приложения.
+SEARCH_TABLE = 'blog_post_search'
+
+POSTGRES_INDEX = 'post_search_idx'
+
+BATCH_SIZE = 2000
+
+WORD = re.compile(r'\w+')
+
+stemmers = {
+    'russian': snowballstemmer.stemmer('russian'),
+    'english': snowballstemmer.stemmer('english'),
+}
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    language = 'english' if word.isascii() else 'russian'
+    return stemmers[language].stemWord(word)
+
+
+def stem_text(text):
+    return ' '.join(stem(word) for word in WORD.findall(text))
+
+
+def insert_rows(cursor, rows):
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+        'VALUES (%s, %s, %s)',
+        rows,
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # Выражение совпадает с blog.search.get_search_vector().
+        schema_editor.execute(
+            f'CREATE INDEX {POSTGRES_INDEX} ON blog_post USING GIN (('
+            "setweight(to_tsvector('russian'::regconfig, "
+            "COALESCE((title)::text, '')), 'A') || "
+            "setweight(to_tsvector('russian'::regconfig, "
+            "COALESCE((text)::text, '')), 'B')))"
+        )
+    elif vendor == 'sqlite':
+        # Индекс хранит основы слов, полученные Snowball-стеммером.
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+            "title, text, tokenize='unicode61 remove_diacritics 2')"
+        )
+        Post = apps.get_model('blog', 'Post')
+        rows = []
+        with schema_editor.connection.cursor() as cursor:
+            for pk, title, text in Post.objects.values_list(
+                'pk', 'title', 'text'
+            ).iterator(chunk_size=BATCH_SIZE):
+                rows.append((pk, stem_text(title), stem_text(text)))
+                if len(rows) >= BATCH_SIZE:
+                    insert_rows(cursor, rows)
+                    rows = []
+            insert_rows(cursor, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRES_INDEX}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_export_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
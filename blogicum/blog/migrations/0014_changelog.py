@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=32, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='id строки')),
+                ('post_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='id публикации')),
+                ('action', models.CharField(choices=[('updated', 'Изменено'), ('deleted', 'Удалено')], max_length=16, verbose_name='Действие')),
+                ('changed_at', models.DateTimeField(auto_now_add=True, verbose_name='Время')),
+            ],
+            options={
+                'verbose_name': 'запись журнала изменений',
+                'verbose_name_plural': 'Журнал изменений',
+                'indexes': [models.Index(fields=['model', 'changed_at'], name='changelog_model_idx'), models.Index(fields=['post_id', 'changed_at'], name='changelog_post_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_search_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(max_length=200, unique=True, verbose_name='Вид')),
+                ('count', models.PositiveBigIntegerField(default=0, verbose_name='Запросов')),
+                ('over_budget', models.PositiveBigIntegerField(default=0, verbose_name='Сверх бюджета')),
+                ('queries_sum', models.FloatField(default=0)),
+                ('queries_max', models.FloatField(default=0)),
+                ('sql_time_sum', models.FloatField(default=0)),
+                ('sql_time_max', models.FloatField(default=0)),
+                ('render_time_sum', models.FloatField(default=0)),
+                ('render_time_max', models.FloatField(default=0)),
+                ('total_time_sum', models.FloatField(default=0)),
+                ('total_time_max', models.FloatField(default=0)),
+                ('size_sum', models.FloatField(default=0)),
+                ('size_max', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name': 'производительность вида',
+                'verbose_name_plural': 'Производительность видов',
+            },
+        ),
+    ]
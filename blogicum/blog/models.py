@@ -1,7 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
-from .constants import LIMIT_SYMBOLS, LIMIT_SYMBOLS_MAX
+from .constants import JOB_MAX_ATTEMPTS, LIMIT_SYMBOLS, LIMIT_SYMBOLS_MAX
 
 User = get_user_model()
 
@@ -10,7 +11,8 @@ class PublishCreatModel(models.Model):
     """
     Абстрактная модель для постов.
 
-    Эта модель добавляет к наследникам флаг is_published и дату создания.
+    Эта модель добавляет к наследникам флаг is_published, дату создания
+    и дату последнего изменения.
     Используется как база для других моделей,
     требующих отслеживание публикации и времени создания.
     """
@@ -24,6 +26,10 @@ class PublishCreatModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -75,6 +81,13 @@ class Post(PublishCreatModel):
         blank=True,
         null=True
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото',
+        help_text='Заполняется автоматически после загрузки фото.'
+    )
     pub_date = models.DateTimeField(
         auto_now_add=False,
         verbose_name='Дата и время публикации',
@@ -86,6 +99,8 @@ class Post(PublishCreatModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        # Поиск по автору обслуживает составной post_author_feed_idx.
+        db_index=False,
         verbose_name='Автор публикации',
         related_name='posts'
     )
@@ -104,21 +119,97 @@ class Post(PublishCreatModel):
         verbose_name='Категория',
         related_name='posts'
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+        help_text='Обновляется при добавлении и удалении комментариев.'
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = [
+            # Лента на главной: только опубликованные, от новых к старым.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            # Лента категории.
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            # Профиль: автор видит и снятые с публикации посты.
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+            # Инкрементальная выгрузка export_blog --since.
+            models.Index(fields=['updated_at'], name='post_updated_idx'),
+            # Список в админке и date_hierarchy: все посты по дате.
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         if len(self.title) > LIMIT_SYMBOLS_MAX:
             return self.title[:LIMIT_SYMBOLS] + '...'
         return self.title
 
+    @property
+    def card_version(self):
+        """
+        Версия карточки поста для кеша шаблона.
+
+        Меняется при изменении самого поста, числа комментариев,
+        автора, категории или местоположения.
+        """
+        parts = [
+            self.updated_at.timestamp(),
+            self.comment_count,
+            self.author.username,
+        ]
+        if self.category_id:
+            parts += [self.category_id, self.category.updated_at.timestamp()]
+        if self.location_id:
+            parts += [self.location_id, self.location.updated_at.timestamp()]
+        return ':'.join(str(part) for part in parts)
+
+
+class PostSearchEntry(models.Model):
+    """
+    Строка полнотекстового индекса FTS5 (только SQLite).
+
+    Таблица создаётся миграцией 0012 и заполняется blog.search; модель
+    нужна, чтобы присоединять индекс к запросу постов через ORM.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_entry',
+    )
+    title = models.TextField()
+    text = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        # Поиск по посту обслуживает составной comment_post_created_idx.
+        db_index=False,
         related_name='comments',
         verbose_name='Публикация',
     )
@@ -140,6 +231,14 @@ class Comment(models.Model):
         ordering = ['created_at']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_idx',
+            ),
+            # Инкрементальная выгрузка export_blog --since.
+            models.Index(fields=['created_at'], name='comment_created_idx'),
+        ]
 
     def __str__(self):
         return (
@@ -147,3 +246,152 @@ class Comment(models.Model):
             f"on {self.post}\n"
             f"text: {self.text}"
         )
+
+
+class Job(models.Model):
+    """Фоновая задача, выполняемая командой run_jobs вне запроса."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    task = models.CharField(max_length=128, verbose_name='Задача')
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Аргументы'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=JOB_MAX_ATTEMPTS,
+        verbose_name='Максимум попыток'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Не раньше'
+    )
+    claim_id = models.CharField(
+        max_length=32,
+        blank=True,
+        editable=False,
+        verbose_name='Метка обработчика'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='pending'),
+                name='job_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} #{self.pk} ({self.get_status_display()})'
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Правка или удаление строки, которых не видно по её полям.
+
+    Нужен инкрементальной выгрузке export_blog: у комментария нет даты
+    изменения, а удалённые строки не найти по updated_at. По журналу
+    считается и Last-Modified страницы поста. Записи старше
+    BLOG_CHANGELOG_RETENTION_DAYS удаляет export_blog --watermark.
+    """
+
+    class Action(models.TextChoices):
+        UPDATED = 'updated', 'Изменено'
+        DELETED = 'deleted', 'Удалено'
+
+    model = models.CharField(max_length=32, verbose_name='Модель')
+    object_id = models.PositiveBigIntegerField(verbose_name='id строки')
+    # Для комментариев: Last-Modified страницы поста.
+    post_id = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='id публикации'
+    )
+    action = models.CharField(
+        max_length=16,
+        choices=Action.choices,
+        verbose_name='Действие'
+    )
+    changed_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Время'
+    )
+
+    class Meta:
+        verbose_name = 'запись журнала изменений'
+        verbose_name_plural = 'Журнал изменений'
+        indexes = [
+            models.Index(
+                fields=['model', 'changed_at'], name='changelog_model_idx'
+            ),
+            models.Index(
+                fields=['post_id', 'changed_at'], name='changelog_post_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.model} #{self.object_id}: {self.get_action_display()}'
+
+
+class ViewPerformance(models.Model):
+    """
+    Сводка PerformanceMiddleware по виду (см. blog.performance).
+
+    Хранится в базе, а не в кеше: так её видят все процессы сервера
+    и manage.py performance_report. Для каждой метрики из
+    blog.performance.METRICS есть сумма (для среднего) и максимум.
+    """
+
+    view = models.CharField(max_length=200, unique=True, verbose_name='Вид')
+    count = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Запросов'
+    )
+    over_budget = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Сверх бюджета'
+    )
+    queries_sum = models.FloatField(default=0)
+    queries_max = models.FloatField(default=0)
+    sql_time_sum = models.FloatField(default=0)
+    sql_time_max = models.FloatField(default=0)
+    render_time_sum = models.FloatField(default=0)
+    render_time_max = models.FloatField(default=0)
+    total_time_sum = models.FloatField(default=0)
+    total_time_max = models.FloatField(default=0)
+    size_sum = models.FloatField(default=0)
+    size_max = models.FloatField(default=0)
+
+    class Meta:
+        verbose_name = 'производительность вида'
+        verbose_name_plural = 'Производительность видов'
+
+    def __str__(self):
+        return self.view
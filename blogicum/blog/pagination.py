@@ -0,0 +1,430 @@
+import asyncio
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage, Page, PageNotAnInteger, Paginator
+)
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .constants import ESTIMATED_COUNT_THRESHOLD
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator, который берёт общее количество объектов из кеша.
+
+    Если cache_key не задан, ведёт себя как обычный Paginator.
+    """
+
+    def __init__(self, *args, cache_key=None, timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        count = cache.get(self.cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.cache_key, count, self.timeout)
+        return count
+
+    async def acount(self):
+        """Асинхронный count: кеш через aget, подсчёт через QuerySet.acount."""
+        if 'count' not in self.__dict__:
+            count = None
+            if self.cache_key is not None:
+                count = await cache.aget(self.cache_key)
+            if count is None:
+                count = await self.object_list.acount()
+                if self.cache_key is not None:
+                    await cache.aset(self.cache_key, count, self.timeout)
+            self.__dict__['count'] = count
+        return self.count
+
+    async def afetch(self, number):
+        """Строки страницы number и одна лишняя — признак следующей."""
+        bottom = (number - 1) * self.per_page
+        return [
+            obj async for obj in
+            self.object_list[bottom:bottom + self.per_page + 1]
+        ]
+
+    def build_page(self, object_list, number):
+        return Page(object_list[:self.per_page], number, self)
+
+    def store_count(self, count):
+        if self.cache_key is not None:
+            cache.set(self.cache_key, count, self.timeout)
+
+    def recount(self):
+        """
+        Заменяет количество из кеша или оценку точным COUNT(*).
+
+        Вызывается, когда страница в пределах num_pages оказалась
+        пустой: кеш устарел или оценка завышена. Точное количество
+        кешируется, поэтому COUNT(*) выполняется раз на время жизни кеша.
+        """
+        count = self.object_list.count()
+        self.store_count(count)
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+
+    def clamp_number(self, number):
+        """Номер страницы, который выбрал бы Paginator.get_page."""
+        try:
+            return self.validate_number(number)
+        except PageNotAnInteger:
+            return 1
+        except EmptyPage:
+            return self.num_pages
+
+    @staticmethod
+    def is_past_end(page):
+        return not page.object_list and page.number > 1
+
+    def get_page(self, number):
+        """
+        Как Paginator.get_page, но без пустых страниц за концом выборки.
+
+        Если выбранная страница пуста, количество пересчитывается
+        и показывается настоящая последняя страница.
+        """
+        page = self.page(self.clamp_number(number))
+        if self.is_past_end(page):
+            self.recount()
+            page = self.page(self.clamp_number(page.number))
+        return page
+
+    async def aget_page(self, number):
+        """
+        Асинхронный get_page для асинхронных видов.
+
+        Количество и строки страницы запрашиваются одновременно,
+        object_list страницы — уже загруженный список, и шаблон
+        не обращается к базе.
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        requested = max(number, 1)
+        _, object_list = await asyncio.gather(
+            self.acount(), self.afetch(requested)
+        )
+        number = self.clamp_number(number)
+        if number != requested:
+            object_list = await self.afetch(number)
+        page = self.build_page(object_list, number)
+        if self.is_past_end(page):
+            await sync_to_async(self.recount)()
+            number = self.clamp_number(number)
+            page = self.build_page(await self.afetch(number), number)
+        return page
+
+
+def estimate_table_rows(model, using=DEFAULT_DB_ALIAS):
+    """
+    Оценка числа строк таблицы по статистике планировщика.
+
+    PostgreSQL: pg_class.reltuples, SQLite: sqlite_stat1 (после ANALYZE).
+    Возвращает None, если статистики нет.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class '
+                    'WHERE oid = to_regclass(%s)',
+                    [table],
+                )
+                rows = [row[0] for row in cursor.fetchall()]
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table]
+                )
+                # Первое число stat — количество строк в индексе.
+                rows = [int(row[0].split()[0]) for row in cursor.fetchall()]
+            else:
+                return None
+    except DatabaseError:
+        return None
+    # reltuples = -1, пока таблицу ни разу не анализировали.
+    estimate = max(rows, default=-1)
+    return int(estimate) if estimate >= 0 else None
+
+
+def estimate_query_rows(queryset):
+    """Оценка числа строк запроса из EXPLAIN (только PostgreSQL)."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedPage(Page):
+    """
+    Страница при приблизительном количестве объектов.
+
+    Следующая страница определяется по лишней строке выборки,
+    а не по num_pages, которое может быть неточным.
+    """
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    @property
+    def num_pages(self):
+        """Оценка числа страниц, не меньше уже известных."""
+        return max(
+            self.paginator.num_pages, self.number + self._has_next
+        )
+
+    @property
+    def page_range(self):
+        """Номера соседних страниц: последняя известна лишь примерно."""
+        last = min(self.number + 2, self.num_pages)
+        return range(max(1, self.number - 2), last + 1)
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """
+    Paginator без COUNT(*) по большим таблицам.
+
+    Для запроса без фильтров берёт оценку из статистики базы, если она
+    больше threshold. Отфильтрованный набор считается с LIMIT
+    threshold + 1; если строк больше, берётся оценка планировщика
+    для этого запроса (только PostgreSQL), а без неё — threshold + 1
+    как оценка снизу (is_lower_bound): следующие страницы определяются
+    по лишней строке выборки, а шаблон выводит «N и более» вместо «≈N».
+    Завышенную оценку исправляет get_page, пересчитывая количество
+    при пустой странице. Признак приближения — is_estimated.
+
+    С cache_key результат хранится в кеше, как у CachedCountPaginator.
+    """
+
+    threshold = ESTIMATED_COUNT_THRESHOLD
+
+    is_estimated = False
+    # Оценки нет, count — лишь нижняя граница (threshold + 1).
+    is_lower_bound = False
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self.estimate_count()
+        key = f'{self.cache_key}:estimate'
+        cached = cache.get(key)
+        if cached is None:
+            cached = (
+                self.estimate_count(), self.is_estimated, self.is_lower_bound
+            )
+            cache.set(key, cached, self.timeout)
+        count, self.is_estimated, self.is_lower_bound = cached
+        return count
+
+    def store_count(self, count):
+        self.is_estimated = self.is_lower_bound = False
+        if self.cache_key is not None:
+            cache.set(
+                f'{self.cache_key}:estimate', (count, False, False),
+                self.timeout,
+            )
+
+    async def acount(self):
+        if 'count' not in self.__dict__:
+            # Оценка читает статистику через cursor(), у которого нет
+            # асинхронного API.
+            await sync_to_async(lambda: self.count)()
+        return self.count
+
+    def build_page(self, object_list, number):
+        if not self.is_estimated:
+            return super().build_page(object_list, number)
+        return EstimatedPage(
+            object_list[:self.per_page], number, self,
+            has_next=len(object_list) > self.per_page,
+        )
+
+    def estimate_count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query') or queryset.query.is_sliced:
+            return len(queryset)
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, using=queryset.db)
+            if estimate is not None and estimate > self.threshold:
+                self.is_estimated = True
+                return estimate
+            return queryset.count()
+        capped = queryset.order_by().values('pk')[:self.threshold + 1].count()
+        if capped <= self.threshold:
+            return capped
+        self.is_estimated = True
+        estimate = estimate_query_rows(queryset)
+        if estimate is None or estimate <= capped:
+            self.is_lower_bound = True
+            return capped
+        return estimate
+
+    def validate_number(self, number):
+        # Оценка всегда больше threshold; count заодно выставляет
+        # is_estimated.
+        if self.count <= self.threshold or not self.is_estimated:
+            return super().validate_number(number)
+        # За оценкой могут быть ещё страницы, поэтому верхняя граница
+        # не проверяется: страницы за концом выборки отсеивает page().
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimated:
+            return super().page(number)
+        # Страница за концом выборки пуста; get_page пересчитает
+        # количество и покажет последнюю.
+        bottom = (number - 1) * self.per_page
+        return self.build_page(
+            list(self.object_list[bottom:bottom + self.per_page + 1]), number
+        )
+
+
+class KeysetPage:
+    """
+    Страница курсорной (keyset) пагинации.
+
+    Повторяет ту часть интерфейса Page, которую используют шаблоны,
+    но вместо номеров страниц хранит курсоры соседних страниц.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинация по ключу (pub_date, id) без COUNT(*) и OFFSET.
+
+    Стоимость любой страницы равна стоимости первой: следующая
+    страница выбирается условием «строго старше последней записи»,
+    предыдущая — «строго новее первой».
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    @staticmethod
+    def encode_cursor(direction, obj):
+        raw = f'{direction}|{obj.pub_date.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Возвращает (направление, pub_date, id) или None."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            direction, pub_date, pk = raw.split('|')
+            return direction, datetime.fromisoformat(pub_date), int(pk)
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            return None
+
+    def get_queryset(self, cursor):
+        """Возвращает (queryset страницы, направление, курсор или None)."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        queryset = self.queryset
+        if decoded is None:
+            direction = self.NEXT
+            queryset = queryset.order_by('-pub_date', '-pk')
+        else:
+            direction, pub_date, pk = decoded
+            if direction == self.PREVIOUS:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                ).order_by('pub_date', 'pk')
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                ).order_by('-pub_date', '-pk')
+        return queryset[:self.per_page + 1], direction, decoded
+
+    def page(self, cursor=None):
+        """Возвращает KeysetPage; неверный курсор даёт первую страницу."""
+        queryset, direction, decoded = self.get_queryset(cursor)
+        return self.build_page(list(queryset), direction, decoded)
+
+    async def apage(self, cursor=None):
+        queryset, direction, decoded = self.get_queryset(cursor)
+        return self.build_page(
+            [obj async for obj in queryset], direction, decoded
+        )
+
+    def build_page(self, object_list, direction, decoded):
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if direction == self.PREVIOUS:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, decoded is not None
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(self.NEXT, object_list[-1])
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(
+                self.PREVIOUS, object_list[0]
+            )
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
@@ -0,0 +1,215 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.template.base import Template
+
+from .models import ViewPerformance
+
+logger = logging.getLogger('blog.performance')
+
+# Замеры текущего запроса; None, когда запрос не измеряется.
+current_metrics = ContextVar('blog_performance_metrics', default=None)
+
+# Метрики запроса: имя -> подпись в отчёте.
+METRICS = {
+    'queries': 'SQL-запросов',
+    'sql_time': 'Время SQL, мс',
+    'render_time': 'Рендеринг, мс',
+    'total_time': 'Всего, мс',
+    'size': 'Размер ответа, байт',
+}
+
+
+class RequestMetrics:
+    """Счётчики одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        # Имя шаблона -> [вызовов, общее время, собственное время].
+        self.templates = defaultdict(lambda: [0, 0.0, 0.0])
+        # Время вложенных шаблонов для каждого рендерящегося сейчас.
+        self.render_stack = []
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+    def template_profile(self):
+        """
+        Профиль шаблонов, от самых долгих по собственному времени.
+
+        Собственное время шаблона — без вложенных {% include %},
+        inclusion-тегов и родителя из {% extends %}; блоки дочернего
+        шаблона рендерятся внутри родителя и входят в его время.
+
+        Returns:
+            Список кортежей (имя, вызовов, общее время, собственное).
+        """
+        return sorted(
+            ((name, *stats) for name, stats in self.templates.items()),
+            key=lambda row: row[3],
+            reverse=True,
+        )
+
+
+original_template_render = Template._render
+
+
+def measured_template_render(self, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return original_template_render(self, context)
+    metrics.render_stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        return original_template_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        nested = metrics.render_stack.pop()
+        stats = metrics.templates[self.name or '<string>']
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - nested
+        if metrics.render_stack:
+            metrics.render_stack[-1] += elapsed
+        else:
+            metrics.render_time += elapsed
+
+
+def install_template_timer():
+    """
+    Включает замер шаблонов внутри measure().
+
+    Перехватывается Template._render: через него проходят и шаблон
+    вида, и {% include %}, и родитель {% extends %}, и inclusion-теги.
+    """
+    global original_template_render
+    if Template._render is not measured_template_render:
+        original_template_render = Template._render
+        Template._render = measured_template_render
+
+
+@contextmanager
+def measure():
+    """
+    Считает SQL-запросы и время рендеринга шаблонов внутри блока.
+
+    Время шаблонов считается после install_template_timer().
+    """
+    metrics = RequestMetrics()
+    token = current_metrics.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.sql_wrapper)
+                )
+            yield metrics
+    finally:
+        current_metrics.reset(token)
+
+
+def get_budget(view_name):
+    """Бюджет вида: общий 'default', дополненный настройками вида."""
+    budgets = settings.BLOG_PERFORMANCE_BUDGETS
+    return {**budgets.get('default', {}), **budgets.get(view_name, {})}
+
+
+def check_budget(view_name, sample):
+    """Пишет в лог метрики, превысившие бюджет вида."""
+    violations = [
+        f'{name}={sample[name]:g} > {limit:g}'
+        for name, limit in get_budget(view_name).items()
+        if sample.get(name, 0) > limit
+    ]
+    if violations:
+        logger.warning(
+            'Превышен бюджет %s: %s', view_name, ', '.join(violations)
+        )
+    return violations
+
+
+def log_template_profile(view_name, metrics, limit=10):
+    """Пишет профиль шаблонов запроса в лог на уровне DEBUG."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug('Шаблоны %s: %s', view_name, '; '.join(
+        f'{name} x{calls} {total * 1000:.1f}/{own * 1000:.1f} мс'
+        for name, calls, total, own in metrics.template_profile()[:limit]
+    ))
+
+
+def record(view_name, sample):
+    """
+    Добавляет замер запроса в сводку по виду.
+
+    Сводка хранится в таблице ViewPerformance, общей для всех процессов
+    сервера. Замер добавляется одним UPDATE с F()-выражениями, поэтому
+    одновременные запросы к виду не теряют замеров.
+    """
+    updates = {
+        'count': F('count') + 1,
+        'over_budget': F('over_budget') + bool(sample.get('violations')),
+    }
+    for name in METRICS:
+        value = Value(float(sample[name]))
+        updates[f'{name}_sum'] = F(f'{name}_sum') + value
+        updates[f'{name}_max'] = Greatest(f'{name}_max', value)
+    stats = ViewPerformance.objects.filter(view=view_name)
+    if stats.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            ViewPerformance.objects.create(
+                view=view_name,
+                count=1,
+                over_budget=bool(sample.get('violations')),
+                **{
+                    f'{name}_{total}': sample[name]
+                    for name in METRICS
+                    for total in ('sum', 'max')
+                },
+            )
+    except IntegrityError:
+        # Первый замер вида успел записать другой процесс.
+        stats.update(**updates)
+
+
+def get_report(sort='total_time'):
+    """
+    Сводка по видам, от самых медленных к быстрым.
+
+    Returns:
+        Список словарей с именем вида, числом запросов, превышениями
+        бюджета и средним и максимальным значением каждой метрики.
+    """
+    report = []
+    for stats in ViewPerformance.objects.filter(count__gt=0):
+        row = {
+            'view': stats.view,
+            'count': stats.count,
+            'over_budget': stats.over_budget,
+        }
+        for name in METRICS:
+            row[f'{name}_avg'] = getattr(stats, f'{name}_sum') / stats.count
+            row[f'{name}_max'] = getattr(stats, f'{name}_max')
+        report.append(row)
+    report.sort(key=lambda row: row[f'{sort}_avg'], reverse=True)
+    return report
+
+
+def reset_report():
+    ViewPerformance.objects.all().delete()
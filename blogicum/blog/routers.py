@@ -0,0 +1,76 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Читать ли текущему запросу с реплик; включает декоратор read_replica.
+replica_reads = ContextVar('blog_replica_reads', default=False)
+
+# Ключ сессии: до какого момента (time.time()) читать с основной базы.
+PRIMARY_PIN_SESSION_KEY = 'blog_primary_pinned_until'
+
+
+def get_replicas():
+    return [
+        alias for alias in settings.BLOG_DATABASE_REPLICAS
+        if alias in connections
+    ]
+
+
+@contextmanager
+def use_replicas():
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+def pin_to_primary(request):
+    """
+    Читать с основной базы ближайшие BLOG_PRIMARY_PIN_SECONDS.
+
+    Реплики отстают от основной базы, и без этого автор мог бы
+    не увидеть только что созданный пост или комментарий.
+    """
+    request.session[PRIMARY_PIN_SESSION_KEY] = (
+        time.time() + settings.BLOG_PRIMARY_PIN_SECONDS
+    )
+
+
+def is_pinned_to_primary(request):
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    return session.get(PRIMARY_PIN_SESSION_KEY, 0) > time.time()
+
+
+class ReplicaRouter:
+    """
+    Направляет чтения видов с декоратором read_replica на реплики.
+
+    Реплики перечислены в BLOG_DATABASE_REPLICAS. Запись, миграции
+    и все остальные чтения идут в основную базу (default).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replica_reads.get() and replicas:
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
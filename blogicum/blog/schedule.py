@@ -0,0 +1,75 @@
+from datetime import datetime, timezone as dt_timezone
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Post
+
+NEXT_PUB_DATE_KEY = 'blog:next_pub_date'
+
+# Значение в кеше, если отложенных публикаций нет.
+NO_PENDING = 'none'
+
+
+def get_next_pub_date():
+    """
+    Дата ближайшей отложенной публикации или None.
+
+    Результат хранится в кеше до наступления этой даты, но не дольше
+    BLOG_FEED_COUNT_TIMEOUT, и сбрасывается при сохранении и удалении
+    постов. Ограничение нужно для записей в обход сигналов
+    (bulk_create, QuerySet.update): отложенный пост, добавленный так,
+    появится в лентах с опозданием не больше этого срока.
+    Выборка идёт по частичному индексу post_published_feed_idx.
+    """
+    now = timezone.now()
+    cached = cache.get(NEXT_PUB_DATE_KEY)
+    if cached == NO_PENDING:
+        return None
+    if cached is not None:
+        next_pub_date = datetime.fromtimestamp(cached, tz=dt_timezone.utc)
+        if next_pub_date > now:
+            return next_pub_date
+
+    next_pub_date = (
+        Post.objects.filter(is_published=True, pub_date__gt=now)
+        .order_by('pub_date')
+        .values_list('pub_date', flat=True)
+        .first()
+    )
+    timeout = settings.BLOG_FEED_COUNT_TIMEOUT
+    if next_pub_date is None:
+        cache.set(NEXT_PUB_DATE_KEY, NO_PENDING, timeout)
+    else:
+        cache.set(
+            NEXT_PUB_DATE_KEY,
+            next_pub_date.timestamp(),
+            min(timeout, ceil((next_pub_date - now).total_seconds())),
+        )
+    return next_pub_date
+
+
+def refresh_next_pub_date():
+    cache.delete(NEXT_PUB_DATE_KEY)
+
+
+def get_cache_timeout(default):
+    """
+    Время жизни кеша, зависящего от времени публикации постов.
+
+    Не превышает default и истекает ровно к дате ближайшей отложенной
+    публикации, чтобы она появилась в лентах вовремя.
+    """
+    next_pub_date = get_next_pub_date()
+    if next_pub_date is None:
+        return default
+    seconds = ceil((next_pub_date - timezone.now()).total_seconds())
+    return max(1, min(default, seconds))
+
+
+async def aget_cache_timeout(default):
+    """get_cache_timeout для асинхронных видов."""
+    return await sync_to_async(get_cache_timeout)(default)
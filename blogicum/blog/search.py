@@ -0,0 +1,169 @@
+import re
+from functools import lru_cache
+
+import snowballstemmer
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .constants import SEARCH_RECENCY_DAYS, SEARCH_TITLE_WEIGHT
+
+SEARCH_TABLE = 'blog_post_search'
+
+WORD = re.compile(r'\w+')
+
+stemmers = {
+    'russian': snowballstemmer.stemmer('russian'),
+    'english': snowballstemmer.stemmer('english'),
+}
+
+
+@lru_cache(maxsize=100_000)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    language = 'english' if word.isascii() else 'russian'
+    return stemmers[language].stemWord(word)
+
+
+def stem_text(text):
+    """Приводит слова к основам: «публикации» -> «публикац»."""
+    return ' '.join(stem(word) for word in WORD.findall(text))
+
+
+def build_match(query):
+    """
+    Запрос FTS5: все основы слов, каждая как префикс.
+
+    Слова берутся в кавычки, поэтому синтаксис FTS5 во вводе
+    пользователя не интерпретируется.
+    """
+    return ' AND '.join(
+        f'"{stem(word)}"*' for word in WORD.findall(query)
+    )
+
+
+def uses_fts():
+    return connection.vendor == 'sqlite'
+
+
+def index_posts(posts):
+    """Добавляет или обновляет посты в индексе FTS5 (только SQLite)."""
+    if not uses_fts():
+        return
+    rows = [
+        (post.pk, stem_text(post.title), stem_text(post.text))
+        for post in posts
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+            [(pk,) for pk, _, _ in rows],
+        )
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            rows,
+        )
+
+
+def unindex_post(post_id):
+    if not uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post_id]
+        )
+
+
+def rebuild_index(batch_size=2000):
+    """
+    Заново строит индекс FTS5 по всем постам.
+
+    Нужен после загрузки данных в обход сигналов
+    (bulk_loaddata, seed_blog). На PostgreSQL индекс строится
+    по выражению и обновляется самой базой.
+
+    Returns:
+        Количество проиндексированных постов.
+    """
+    from .models import Post
+
+    if not uses_fts():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    batch = []
+    total = 0
+    for post in Post.objects.only('title', 'text').iterator(
+        chunk_size=batch_size
+    ):
+        batch.append(post)
+        if len(batch) >= batch_size:
+            index_posts(batch)
+            total += len(batch)
+            batch = []
+    index_posts(batch)
+    return total + len(batch)
+
+
+def search_posts(queryset, query):
+    """
+    Посты из queryset, подходящие под запрос, от самых релевантных.
+
+    Релевантность (bm25 на SQLite, ts_rank на PostgreSQL; совпадения
+    в заголовке весят больше) делится на 1 + возраст поста
+    в SEARCH_RECENCY_DAYS, так что при равной релевантности
+    выше свежие посты.
+    """
+    if not WORD.search(query):
+        return queryset.none()
+    if not uses_fts():
+        return search_posts_postgres(queryset, query)
+    table = connection.ops.quote_name(SEARCH_TABLE)
+    post_table = connection.ops.quote_name(queryset.model._meta.db_table)
+    # Условие на search_entry присоединяет таблицу индекса под её
+    # именем, и MATCH с bm25 работают в том же запросе.
+    # bm25 отрицателен: чем меньше, тем релевантнее.
+    return queryset.filter(
+        RawSQL(
+            f'{table} MATCH %s', (build_match(query),),
+            output_field=BooleanField(),
+        ),
+        search_entry__isnull=False,
+    ).annotate(
+        search_rank=RawSQL(
+            f'-bm25({table}, %s, 1.0) / (1 + (julianday(\'now\') - '
+            f'julianday({post_table}.pub_date)) / %s)',
+            (SEARCH_TITLE_WEIGHT, SEARCH_RECENCY_DAYS),
+            output_field=FloatField(),
+        ),
+    ).order_by('-search_rank', '-pub_date')
+
+
+def get_search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    # Должно совпадать с выражением индекса из миграции 0012.
+    return (
+        SearchVector('title', config='russian', weight='A')
+        + SearchVector('text', config='russian', weight='B')
+    )
+
+
+def search_posts_postgres(queryset, query):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+    from django.db.models import F
+
+    search_query = SearchQuery(query, config='russian', search_type='plain')
+    vector = get_search_vector()
+    age_days = RawSQL(
+        'EXTRACT(EPOCH FROM (NOW() - blog_post.pub_date)) / 86400', ()
+    )
+    return queryset.alias(search_vector=vector).filter(
+        search_vector=search_query
+    ).annotate(
+        search_rank=SearchRank(
+            vector, search_query,
+            weights=[0.1, 0.2, 1.0 / SEARCH_TITLE_WEIGHT, 1.0],
+        ) / (1 + age_days / SEARCH_RECENCY_DAYS),
+    ).order_by(F('search_rank').desc(), '-pub_date')
@@ -0,0 +1,282 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .images import delete_derivatives
+from .models import Category, ChangeLogEntry, Comment, Location, Post
+from .schedule import refresh_next_pub_date
+from .search import index_posts, unindex_post
+from .utils import (
+    get_actual_comment_count, invalidate_feed_counts, invalidate_pages
+)
+
+# Поля, от которых зависит попадание публикации в ленты.
+FEED_FIELDS = {
+    'pub_date', 'is_published', 'category', 'category_id',
+    'author', 'author_id',
+}
+
+
+def invalidate(func, *args):
+    """
+    Сбрасывает кеш сразу и ещё раз после коммита транзакции.
+
+    Повторный сброс не даёт закешировать страницу, отрисованную
+    конкурентным запросом по данным до коммита.
+    """
+    func(*args)
+    transaction.on_commit(lambda: func(*args))
+
+
+def get_post_feeds(category_id, author_id):
+    return {'index', f'category:{category_id}', f'author:{author_id}'}
+
+
+def get_post_pages(post_id, category_slug, author_username):
+    pages = {'index', f'post:{post_id}', f'author:{author_username}'}
+    if category_slug:
+        pages.add(f'category:{category_slug}')
+    return pages
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_feeds(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает ленты поста до сохранения: пост мог сменить категорию."""
+    instance._previous_feeds = set()
+    instance._previous_pages = set()
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not FEED_FIELDS & set(update_fields):
+        return
+    previous = Post.objects.filter(pk=instance.pk).values(
+        'category_id', 'category__slug', 'author_id', 'author__username'
+    ).first()
+    if previous:
+        instance._previous_feeds = get_post_feeds(
+            previous['category_id'], previous['author_id']
+        )
+        instance._previous_pages = get_post_pages(
+            instance.pk,
+            previous['category__slug'],
+            previous['author__username'],
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_caches(sender, instance, update_fields=None, **kwargs):
+    invalidate(refresh_next_pub_date)
+    category_slug = instance.category.slug if instance.category_id else None
+    invalidate(
+        invalidate_pages,
+        *get_post_pages(instance.pk, category_slug, instance.author.username)
+        | getattr(instance, '_previous_pages', set())
+    )
+    if update_fields is not None and not FEED_FIELDS & set(update_fields):
+        return
+    invalidate(
+        invalidate_feed_counts,
+        *get_post_feeds(instance.category_id, instance.author_id)
+        | getattr(instance, '_previous_feeds', set())
+    )
+
+
+@receiver(post_delete, sender=Post)
+def delete_image_derivatives(sender, instance, **kwargs):
+    delete_derivatives(instance.image.storage, instance.image_derivatives)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'text'} & set(
+        update_fields
+    ):
+        return
+    index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw, **kwargs):
+    """Запоминает пост комментария: в админке его можно сменить."""
+    instance._previous_post_id = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_post_id = (
+        Comment.objects.filter(pk=instance.pk)
+        .values_list('post_id', flat=True)
+        .first()
+    )
+
+
+def change_comment_count(post_id, delta):
+    # updated_at меняется вместе со счётчиком, чтобы пост попал
+    # в инкрементальную выгрузку export_blog.
+    Post.objects.filter(pk=post_id, comment_count__gte=-delta).update(
+        comment_count=F('comment_count') + delta,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    """
+    Поддерживает Post.comment_count, откуда бы ни пришёл комментарий.
+
+    Фикстуры (raw) приходят с готовыми счётчиками постов.
+    """
+    if raw:
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif previous_post_id not in (None, instance.post_id):
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, origin=None, **kwargs):
+    """Отмечает пост, который удаляется вместе с комментариями."""
+    if origin is not None:
+        claim_posts(origin, '_deleted_post_ids', {instance.pk})
+
+
+def claim_posts(origin, name, post_ids):
+    """
+    Оставляет посты, которых ещё не было в этом удалении.
+
+    При каскадном удалении сигнал приходит на каждый комментарий,
+    а работа нужна одна на пост. Отметки хранятся на объекте,
+    с которого началось удаление (origin), и живут, пока оно идёт.
+    Посты, удаляемые вместе с комментариями, отбрасываются: их
+    страницы сбросит сигнал самого поста.
+    """
+    if origin is None:
+        return post_ids
+    claimed = getattr(origin, name, set())
+    post_ids = post_ids - claimed - getattr(origin, '_deleted_post_ids', set())
+    setattr(origin, name, claimed | post_ids)
+    return post_ids
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    # Django удаляет всю пачку комментариев до первого post_delete,
+    # поэтому пересчёта на пост хватает на всю пачку.
+    post_ids = claim_posts(origin, '_recounted_post_ids', {instance.post_id})
+    Post.objects.filter(pk__in=post_ids).update(
+        comment_count=get_actual_comment_count(),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, origin=None, **kwargs):
+    # Число комментариев выводится и в карточках лент.
+    post_ids = claim_posts(origin, '_invalidated_post_ids', {
+        instance.post_id, getattr(instance, '_previous_post_id', None)
+    } - {None})
+    if not post_ids:
+        return
+    for post_pages in Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', 'category__slug', 'author__username'
+    ):
+        invalidate(invalidate_pages, *get_post_pages(*post_pages))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, instance, **kwargs):
+    # Публикация категории меняет все ленты, включая профили авторов.
+    invalidate(invalidate_feed_counts)
+    invalidate(invalidate_pages)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    invalidate(invalidate_pages)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_username(sender, instance, raw, update_fields, **kwargs):
+    """Запоминает имя пользователя до сохранения: его могли сменить."""
+    instance._previous_username = None
+    if raw or instance.pk is None:
+        return
+    # Вход в систему сохраняет только last_login.
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    instance._previous_username = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list('username', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_pages(sender, instance, **kwargs):
+    previous_username = getattr(instance, '_previous_username', None)
+    if previous_username is None:
+        return
+    if previous_username != instance.username:
+        # Имя выводится в шапке и в карточках постов всех лент.
+        invalidate(invalidate_pages)
+    else:
+        invalidate(invalidate_pages, f'author:{instance.username}')
+
+
+def log_change(instance, action):
+    ChangeLogEntry.objects.create(
+        model=instance._meta.model_name,
+        object_id=instance.pk,
+        post_id=getattr(instance, 'post_id', None),
+        action=action,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def log_comment_update(sender, instance, created, raw, **kwargs):
+    # У комментария нет даты изменения, правка видна только в журнале.
+    if not created and not raw:
+        log_change(instance, ChangeLogEntry.Action.UPDATED)
+
+
+@receiver(pre_delete, sender=Post)
+def log_post_comments_deletion(sender, instance, origin=None, **kwargs):
+    # Комментарии удаляемого поста пишутся в журнал одним INSERT,
+    # а не сигналом на каждый (см. remember_deleted_post).
+    if origin is None:
+        return
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(
+            model=Comment._meta.model_name,
+            object_id=comment_id,
+            post_id=instance.pk,
+            action=ChangeLogEntry.Action.DELETED,
+        )
+        for comment_id in instance.comments.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def log_deletion(sender, instance, origin=None, **kwargs):
+    if sender is Comment and instance.post_id in getattr(
+        origin, '_deleted_post_ids', ()
+    ):
+        return
+    log_change(instance, ChangeLogEntry.Action.DELETED)
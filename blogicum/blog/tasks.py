@@ -0,0 +1,16 @@
+from .images import generate_derivatives, needs_derivatives
+from .jobs import task
+from .models import Post
+
+
+@task('blog.generate_image_derivatives')
+def generate_image_derivatives(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    # Пока задача ждала, пост могли удалить или фото уже обработали.
+    if post is not None and needs_derivatives(post):
+        generate_derivatives(post)
+
+
+@task('blog.noop')
+def noop(**payload):
+    """Пустая задача для замера пропускной способности очереди."""
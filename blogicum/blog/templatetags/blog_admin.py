@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+from django.db import models
+from django.utils import timezone
+
+register = template.Library()
+
+
+def next_period(moment, kind):
+    if kind == 'year':
+        return moment.replace(year=moment.year + 1)
+    if kind == 'month':
+        if moment.month == 12:
+            return moment.replace(year=moment.year + 1, month=1)
+        return moment.replace(month=moment.month + 1)
+    return date.fromordinal(moment.toordinal() + 1)
+
+
+def truncate(moment, kind):
+    if kind == 'year':
+        return date(moment.year, 1, 1)
+    if kind == 'month':
+        return date(moment.year, moment.month, 1)
+    return date(moment.year, moment.month, moment.day)
+
+
+class IndexedDates:
+    """
+    Обёртка над queryset для date_hierarchy без полного просмотра таблицы.
+
+    Стандартный date_hierarchy берёт MIN и MAX одним запросом, а периоды —
+    через DISTINCT по усечённой дате; индекс по полю при этом не
+    используется. Здесь границы ищутся двумя запросами с ORDER BY ...
+    LIMIT 1, а каждый период проверяется EXISTS по диапазону дат.
+    Периодов на уровне не больше 31 (дни месяца) или числа лет.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.bounds = {}
+
+    def aggregate(self, first, last):
+        field_name = first.source_expressions[0].name
+        if field_name not in self.bounds:
+            values = self.queryset.order_by().values_list(
+                field_name, flat=True
+            )
+            self.bounds[field_name] = {
+                'first': values.order_by(field_name).first(),
+                'last': values.order_by(f'-{field_name}').first(),
+            }
+        return self.bounds[field_name]
+
+    def periods(self, field_name, kind, is_datetime):
+        bounds = self.aggregate(models.Min(field_name), models.Max(field_name))
+        if bounds['first'] is None:
+            return []
+        if is_datetime:
+            bounds = {
+                key: timezone.localtime(value)
+                if timezone.is_aware(value) else value
+                for key, value in bounds.items()
+            }
+        start = truncate(bounds['first'], kind)
+        last = truncate(bounds['last'], kind)
+        periods = []
+        while start <= last:
+            end = next_period(start, kind)
+            lower, upper = start, end
+            if is_datetime:
+                lower, upper = (
+                    datetime(moment.year, moment.month, moment.day)
+                    for moment in (start, end)
+                )
+                if timezone.is_aware(bounds['first']):
+                    lower = timezone.make_aware(lower)
+                    upper = timezone.make_aware(upper)
+            if self.queryset.filter(**{
+                f'{field_name}__gte': lower,
+                f'{field_name}__lt': upper,
+            }).exists():
+                periods.append(lower)
+            start = end
+        return periods
+
+    def dates(self, field_name, kind):
+        return self.periods(field_name, kind, is_datetime=False)
+
+    def datetimes(self, field_name, kind):
+        return self.periods(field_name, kind, is_datetime=True)
+
+
+class IndexedDateHierarchyChangeList:
+    """ChangeList, у которого queryset подменён на IndexedDates."""
+
+    def __init__(self, changelist):
+        self.changelist = changelist
+        self.queryset = IndexedDates(changelist.queryset)
+
+    def __getattr__(self, name):
+        return getattr(self.changelist, name)
+
+
+def indexed_date_hierarchy(cl):
+    return date_hierarchy(IndexedDateHierarchyChangeList(cl))
+
+
+@register.tag(name='indexed_date_hierarchy')
+def indexed_date_hierarchy_tag(parser, token):
+    """Замена {% date_hierarchy cl %} для больших таблиц."""
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=indexed_date_hierarchy,
+        template_name='date_hierarchy.html',
+        takes_context=False,
+    )
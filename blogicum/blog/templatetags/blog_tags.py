@@ -0,0 +1,88 @@
+from django import template
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+from blog.images import get_srcsets
+from blog.urlbuilder import get_url_builder
+
+register = template.Library()
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+
+
+@register.simple_tag(takes_context=True)
+def build_url(context, viewname, *args):
+    """
+    Замена {% url %} с позиционными аргументами без обхода резолвера.
+
+    Сборщик URL маршрута создаётся один раз на рендеринг шаблона
+    (см. blog.urlbuilder).
+    """
+    builders = context.render_context.setdefault('blog_url_builders', {})
+    key = (viewname, len(args))
+    if key not in builders:
+        builders[key] = get_url_builder(viewname, len(args))
+    return builders[key](*args)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes='(max-width: 640px) 100vw, 640px'):
+    """Фото публикации с WebP-вариантами и srcset уменьшенных копий."""
+    return {'post': post, 'srcsets': get_srcsets(post), 'sizes': sizes}
+
+
+def get_post_card_key(post):
+    return make_template_fragment_key(
+        'post_cards', [post.pk, post.card_version]
+    )
+
+
+@register.simple_tag
+def post_cards(posts):
+    """
+    Карточки страницы публикаций за один проход.
+
+    Готовые карточки берутся из кеша одним get_many, остальные
+    рендерятся одним скомпилированным шаблоном в общем контексте,
+    а новые сохраняются одним set_many. Ссылки собираются без
+    резолвера (blog.urlbuilder), для автора и категории — один раз
+    на страницу.
+    Карточка не зависит от пользователя и запроса, поэтому кешируется
+    общей для всех лент по версии поста (Post.card_version).
+    """
+    posts = list(posts)
+    keys = [get_post_card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    card_template = None
+    context = template.Context()
+    urls = {}
+    for post, key in zip(posts, keys):
+        if key in cards:
+            continue
+        if card_template is None:
+            card_template = get_template(POST_CARD_TEMPLATE).template
+            profile_url = get_url_builder('blog:profile')
+            category_posts_url = get_url_builder('blog:category_posts')
+            post_detail_url = get_url_builder('blog:post_detail')
+        author_url = ('author', post.author.username)
+        if author_url not in urls:
+            urls[author_url] = profile_url(post.author.username)
+        category_url = ('category', post.category_id)
+        if category_url not in urls:
+            urls[category_url] = post.category_id and category_posts_url(
+                post.category.slug
+            )
+        with context.push(
+            post=post,
+            post_url=post_detail_url(post.pk),
+            author_url=urls[author_url],
+            category_url=urls[category_url],
+        ):
+            cards[key] = missing[key] = card_template.render(context)
+    if missing:
+        cache.set_many(missing, POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(''.join(cards[key] for key in keys))
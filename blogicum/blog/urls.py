@@ -1,12 +1,25 @@
+from django.conf import settings
 from django.contrib.auth.views import PasswordChangeView
 from django.urls import include, path
 
-from . import views
+from . import async_views, views
 
 
 app_name = 'blog'
 
 
+if settings.BLOG_ASYNC_VIEWS:
+    index = async_views.index
+    post_detail = async_views.post_detail
+    category_posts = async_views.category_posts
+    profile_view = async_views.profile_view
+else:
+    index = views.IndexListView.as_view()
+    post_detail = views.PostDetailView.as_view()
+    category_posts = views.category_posts
+    profile_view = views.profile_view
+
+
 profile_urls = [
     path('edit/', views.edit_profile, name='edit_profile'),
     path(
@@ -16,7 +29,7 @@ profile_urls = [
         ),
         name='password_change'
     ),
-    path('<str:username>/', views.profile_view, name='profile'),
+    path('<str:username>/', profile_view, name='profile'),
 ]
 
 
@@ -38,7 +51,7 @@ posts_urls = [
     ),
     path(
         '<int:post_id>/',
-        views.PostDetailView.as_view(),
+        post_detail,
         name='post_detail'
     ),
 ]
@@ -46,13 +59,18 @@ posts_urls = [
 
 urlpatterns = [
     path('profile/', include(profile_urls)),
-    path('', views.IndexListView.as_view(), name='index'),
+    path('', index, name='index'),
     path('posts/', include(posts_urls)),
     path(
         'posts/<int:post_id>/comment/',
         views.AddCommentView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/edit_comment/<int:comment_id>/',
         views.EditCommentView.as_view(),
@@ -63,9 +81,10 @@ urlpatterns = [
         views.DeleteCommentView.as_view(),
         name='delete_comment'
     ),
+    path('search/', views.search, name='search'),
     path(
         'category/<slug:category_slug>/',
-        views.category_posts,
+        category_posts,
         name='category_posts'
     ),
 ]
@@ -1,23 +1,37 @@
-from django.core.paginator import Paginator
-from django.db.models import Count
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Count, IntegerField, Max, Min, OuterRef, Q, Subquery
+)
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from .constants import POSTS_PER_PAGE
-from blog.models import Post
+from .constants import COMMENTS_PER_PAGE, POSTS_PER_PAGE
+from .pagination import (
+    CachedCountPaginator, EstimatedCountPaginator, KeysetPaginator
+)
+from .schedule import aget_cache_timeout, get_cache_timeout
+from blog.models import ChangeLogEntry, Comment, Post
 
 
 def get_base_queryset(
     manager=Post.objects,
     filter_published=True,
-    comment_count=True
 ):
     """
-    Возвращает QuerySet с опциональными фильтрациями и аннотациями.
+    Возвращает QuerySet публикаций, отсортированный от новых к старым.
+
+    Количество комментариев хранится в поле Post.comment_count,
+    поэтому аннотация с GROUP BY не нужна.
 
     Args:
         manager: Менеджер модели
-        first_flag: Если True, применяет дополнительную фильтрацию.
-        second_flag: Если True, добавляет аннотацию и сортировку.
+        filter_published: Если True, оставляет только опубликованные
+            посты из опубликованных категорий с датой в прошлом.
     """
     queryset = manager.select_related(
         'category',
@@ -32,15 +46,262 @@ def get_base_queryset(
             category__is_published=True,
         )
 
-    if comment_count:
-        queryset = queryset.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+    return queryset.order_by('-pub_date')
+
+
+def get_visible_post(request, post_id, queryset=None):
+    """
+    Публикация, которую можно показать посетителю.
+
+    Автор видит свои неопубликованные и отложенные посты, остальные —
+    только опубликованные.
+    """
+    post = get_object_or_404(
+        Post.objects if queryset is None else queryset, pk=post_id
+    )
+    if post.author_id != request.user.pk:
+        return get_object_or_404(get_base_queryset(), pk=post_id)
+    return post
+
+
+def get_post_last_modified(request, post_id):
+    """
+    Когда последний раз менялась страница поста.
+
+    Берётся самое позднее из времени изменения поста, его категории
+    и местоположения, времени добавления комментариев и записей
+    журнала ChangeLogEntry о правке и удалении комментариев, откуда
+    бы они ни пришли (из видов, админки или Comment.save()).
+    Хватает одного запроса по первичному ключу; результат кешируется
+    до сброса кеша страницы поста.
+    """
+    key = 'blog:post_modified:{}:{}'.format(
+        post_id, get_cache_versions('page', f'page:post:{post_id}')
+    )
+    modified = cache.get(key)
+    if modified is None:
+        values = Post.objects.filter(pk=post_id).annotate(
+            comment_created_at=get_max_subquery(
+                Comment.objects.filter(post=OuterRef('pk')),
+                'post', 'created_at',
+            ),
+            comment_changed_at=get_max_subquery(
+                ChangeLogEntry.objects.filter(post_id=OuterRef('pk')),
+                'post_id', 'changed_at',
+            ),
+        ).values_list(
+            'updated_at', 'category__updated_at', 'location__updated_at',
+            'comment_created_at', 'comment_changed_at',
+        ).first()
+        if values is None:
+            return None
+        modified = max(value for value in values if value is not None)
+        cache.set(key, modified, settings.BLOG_PAGE_CACHE_TIMEOUT)
+    return modified
+
+
+def get_max_subquery(queryset, group_by, field):
+    return Subquery(
+        queryset.order_by().values(group_by).annotate(
+            value=Max(field)
+        ).values('value')
+    )
 
-    return queryset
 
+async def aget_visible_post(request, post_id, queryset=None):
+    """Асинхронный get_visible_post; request.user должен быть загружен."""
+    queryset = Post.objects if queryset is None else queryset
+    try:
+        post = await queryset.aget(pk=post_id)
+        if post.author_id != request.user.pk:
+            post = await get_base_queryset().aget(pk=post_id)
+    except Post.DoesNotExist:
+        raise Http404('Публикация не найдена.')
+    return post
 
-def get_paginated_page(request, queryset, page_size=POSTS_PER_PAGE):
+
+def get_comments_queryset(post):
+    """
+    Комментарии поста с авторами одним запросом.
+
+    Загружаются только поля, которые выводит includes/comments.html.
+    """
+    return post.comments.select_related('author').only(
+        'id',
+        'text',
+        'created_at',
+        'post_id',
+        'author__id',
+        'author__username',
+    )
+
+
+def get_comments_page(post, after=None, limit=COMMENTS_PER_PAGE):
+    """
+    Порция комментариев поста в порядке (created_at, id).
+
+    Args:
+        post: Публикация.
+        after: id комментария, после которого начинается порция.
+        limit: Размер порции.
+
+    Returns:
+        Пару (список комментариев, есть ли комментарии дальше).
+    """
+    anchor = None
+    if after is not None:
+        anchor = post.comments.filter(pk=after).values_list(
+            'created_at', flat=True
+        ).first()
+    comments = list(get_comments_after(post, after, anchor)[:limit + 1])
+    return comments[:limit], len(comments) > limit
+
+
+async def aget_comments_page(post, after=None, limit=COMMENTS_PER_PAGE):
+    """Асинхронный get_comments_page."""
+    anchor = None
+    if after is not None:
+        anchor = await post.comments.filter(pk=after).values_list(
+            'created_at', flat=True
+        ).afirst()
+    comments = [
+        comment async for comment in
+        get_comments_after(post, after, anchor)[:limit + 1]
+    ]
+    return comments[:limit], len(comments) > limit
+
+
+def get_comments_after(post, after, anchor):
+    comments = get_comments_queryset(post).order_by('created_at', 'id')
+    if after is None:
+        return comments
+    if anchor is None:
+        # Комментарий удалили: продолжаем по id.
+        return comments.filter(id__gt=after)
+    return comments.filter(
+        Q(created_at__gt=anchor) | Q(created_at=anchor, id__gt=after)
+    )
+
+
+def get_actual_comment_count():
+    """Выражение с числом комментариев публикации по их таблице."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def update_comment_counts(queryset=None, batch_size=10000):
+    """
+    Пересчитывает Post.comment_count по таблице комментариев.
+
+    Обновляет только расходящиеся счётчики, пачками по диапазону id,
+    чтобы не держать блокировку на всей таблице.
+
+    Args:
+        queryset: Публикации для пересчёта (по умолчанию все).
+        batch_size: Ширина диапазона id в одном UPDATE.
+
+    Returns:
+        Количество исправленных публикаций.
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    actual = get_actual_comment_count()
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        return 0
+
+    repaired = 0
+    for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+        repaired += (
+            queryset.filter(pk__gte=start, pk__lt=start + batch_size)
+            .exclude(comment_count=actual)
+            .update(comment_count=actual)
+        )
+    return repaired
+
+
+def get_cache_versions(*groups):
+    """
+    Возвращает строку текущих версий групп кеша.
+
+    Версия группы — случайная метка; смена метки делает недоступными
+    все ключи, в которые входила прежняя версия.
+    """
+    keys = [f'blog:version:{group}' for group in groups]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex, None)
+            versions[key] = cache.get(key, '')
+    return ':'.join(versions[key] for key in keys)
+
+
+def bump_cache_versions(*groups):
+    """
+    Сбрасывает все ключи, построенные на версиях этих групп.
+
+    Метки get_bump_keys живут BLOG_PRIMARY_PIN_SECONDS — столько,
+    сколько реплики могут отставать от основной базы.
+    """
+    cache.set_many(
+        {f'blog:version:{group}': uuid4().hex for group in groups},
+        None
+    )
+    cache.set_many(
+        dict.fromkeys(get_bump_keys(groups), True),
+        settings.BLOG_PRIMARY_PIN_SECONDS,
+    )
+
+
+def get_bump_keys(groups):
+    """Ключи меток недавнего сброса групп кеша."""
+    return [f'blog:bumped:{group}' for group in groups]
+
+
+def get_feed_count_key(feed, scope='public'):
+    """
+    Ключ кеша общего количества публикаций ленты.
+
+    Args:
+        feed: Лента: 'index', 'category:<id>' или 'author:<id>'.
+        scope: 'public' или 'owner' — автор видит и скрытые посты.
+    """
+    versions = get_cache_versions('count', f'count:{feed}')
+    return f'blog:feed_count:{feed}:{scope}:{versions}'
+
+
+def invalidate_feed_counts(*feeds):
+    """Сбрасывает счётчики лент; без аргументов — всех лент сразу."""
+    if feeds:
+        bump_cache_versions(*(f'count:{feed}' for feed in feeds))
+    else:
+        bump_cache_versions('count')
+
+
+def invalidate_pages(*groups):
+    """Сбрасывает кеш страниц групп; без аргументов — всех страниц."""
+    if groups:
+        bump_cache_versions(*(f'page:{group}' for group in groups))
+    else:
+        bump_cache_versions('page')
+
+
+def get_paginated_page(
+    request,
+    queryset,
+    page_size=POSTS_PER_PAGE,
+    keyset=False,
+    count_key=None,
+    estimated=False
+):
     """
     Функция для пагинации
 
@@ -48,10 +309,55 @@ def get_paginated_page(request, queryset, page_size=POSTS_PER_PAGE):
         request: HttpRequest объект
         queryset: QuerySet для пагинации
         page_size: количество элементов на странице (по умолчанию из settings)
+        keyset: Если True, пагинирует по курсору (pub_date, id)
+            из параметра cursor вместо номера страницы.
+        count_key: Ключ кеша для общего количества элементов
+            (см. get_feed_count_key); без него COUNT(*) на каждый запрос.
+        estimated: Если True, для больших выборок вместо точного
+            количества берётся оценка (см. EstimatedCountPaginator).
 
     """
-    paginator = Paginator(queryset, page_size)
+    if keyset:
+        paginator = KeysetPaginator(queryset, page_size)
+        return paginator.page(request.GET.get('cursor'))
+
+    paginator = make_paginator(
+        queryset, page_size, count_key, estimated,
+        timeout=get_cache_timeout(settings.BLOG_FEED_COUNT_TIMEOUT),
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     return page_obj
+
+
+async def aget_paginated_page(
+    request,
+    queryset,
+    page_size=POSTS_PER_PAGE,
+    keyset=False,
+    count_key=None,
+    estimated=False
+):
+    """Асинхронный get_paginated_page с загруженной страницей."""
+    if keyset:
+        paginator = KeysetPaginator(queryset, page_size)
+        return await paginator.apage(request.GET.get('cursor'))
+
+    paginator = make_paginator(
+        queryset, page_size, count_key, estimated,
+        timeout=await aget_cache_timeout(settings.BLOG_FEED_COUNT_TIMEOUT),
+    )
+    return await paginator.aget_page(request.GET.get('page'))
+
+
+def make_paginator(queryset, page_size, count_key, estimated, timeout):
+    paginator_class = (
+        EstimatedCountPaginator if estimated else CachedCountPaginator
+    )
+    return paginator_class(
+        queryset,
+        page_size,
+        cache_key=count_key,
+        timeout=timeout,
+    )
@@ -1,19 +1,35 @@
+from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from django.db.models import Count
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
 
-from .constants import POSTS_PER_PAGE
+from .constants import POSTS_PER_PAGE, SEARCH_QUERY_MAX_LENGTH
+from .decorators import cache_for_anonymous, conditional_page, read_replica
 from .forms import CommentForm, PostForm
+from .jobs import enqueue
 from .models import Category, Comment, Post
-from .utils import get_base_queryset, get_paginated_page
+from .performance import METRICS, get_report
+from .search import search_posts
+from .urlbuilder import build_url
+from .utils import (
+    get_base_queryset,
+    get_comments_page,
+    get_comments_queryset,
+    get_feed_count_key,
+    get_paginated_page,
+    get_post_last_modified,
+    get_visible_post,
+)
 
 
 class CheckAuthorMixin:
@@ -24,6 +40,19 @@ class CheckAuthorMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+class PostJobsMixin:
+    """Ставит в очередь медленную обработку сохранённого поста."""
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        if 'image' in form.changed_data:
+            enqueue(
+                'blog.generate_image_derivatives',
+                post_id=self.object.pk
+            )
+        return response
+
+
 class RegistrationView(CreateView):
     """Регистрация новых пользователей c автовходом."""
 
@@ -41,6 +70,9 @@ class RegistrationView(CreateView):
         return reverse('blog:index')
 
 
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(conditional_page('index', scheduled=True), name='dispatch')
+@method_decorator(cache_for_anonymous('index'), name='dispatch')
 class IndexListView(ListView):
     """Главная страница с списком всех публикаций."""
 
@@ -52,10 +84,41 @@ class IndexListView(ListView):
         """Возвращаем базовый queryset для отображения на главной странице."""
         return get_base_queryset()
 
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Пагинация как в category_posts и profile_view.
+
+        В отличие от ListView, неверный номер страницы не даёт 404:
+        нечисловой номер показывает первую страницу, номер за концом
+        ленты — последнюю (Paginator.get_page).
+        """
+        page_obj = get_paginated_page(
+            self.request,
+            queryset,
+            page_size,
+            keyset=settings.BLOG_KEYSET_PAGINATION,
+            count_key=get_feed_count_key('index'),
+            estimated=settings.BLOG_ESTIMATED_FEED_COUNT,
+        )
+        return (
+            page_obj.paginator,
+            page_obj,
+            page_obj.object_list,
+            page_obj.has_other_pages()
+        )
+
 
 # посты
 
 
+@method_decorator(read_replica, name='dispatch')
+@method_decorator(
+    conditional_page(
+        'post:{post_id}', last_modified=get_post_last_modified
+    ),
+    name='dispatch',
+)
+@method_decorator(cache_for_anonymous('post:{post_id}'), name='dispatch')
 class PostDetailView(DetailView):
     """Отоброжение полной информации из публикации."""
 
@@ -64,29 +127,81 @@ class PostDetailView(DetailView):
     pk_url_kwarg = 'post_id'
 
     def get_queryset(self):
-        return super().get_queryset().select_related('author').annotate(
-            comments_count=Count('comments')
+        return super().get_queryset().select_related(
+            'author',
+            'category',
+            'location'
         )
 
     def get_context_data(self, **kwargs):
         """Получаем базовый контекст и добавляем дополнительные данные."""
         context = super().get_context_data(**kwargs)
         post = self.object
-        context['comments'] = post.comments.all()
+        if 'all_comments' in self.request.GET:
+            context['comments'] = get_comments_queryset(post)
+        else:
+            # Остальные комментарии догружаются порциями через
+            # post_comments, чтобы страница не росла с обсуждением.
+            comments, has_more = get_comments_page(post)
+            context['comments'] = comments
+            context['comments_has_more'] = has_more
         context['form'] = CommentForm()
         return context
 
     def get_object(self):
-        post = super().get_object()
-        if self.request.user != post.author:
-            return get_object_or_404(
-                get_base_queryset
-                (comment_count=False),
-                pk=self.kwargs['post_id']
-            )
-        return post
+        return get_visible_post(
+            self.request,
+            self.kwargs['post_id'],
+            super().get_queryset()
+        )
 
 
+@read_replica
+@cache_for_anonymous('post:{post_id}')
+def post_comments(request, post_id):
+    """
+    Порция комментариев публикации после комментария ?after=<id>.
+
+    Отдаёт HTML-фрагмент для вставки на страницу публикации,
+    а с ?format=json — данные комментариев.
+    """
+    post = get_visible_post(request, post_id)
+    after = request.GET.get('after')
+    if after is not None and not after.isdigit():
+        return HttpResponseBadRequest('Некорректный параметр after.')
+    comments, has_more = get_comments_page(
+        post, after=int(after) if after else None
+    )
+    next_url = None
+    if has_more:
+        next_url = '{}?{}'.format(
+            build_url('blog:post_comments', post.pk),
+            urlencode({'after': comments[-1].pk}),
+        )
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_url and f'{next_url}&format=json',
+        })
+    return render(request, 'includes/comments.html', {
+        'post': post,
+        'comments': comments,
+        'comments_has_more': has_more,
+        'comments_fragment': True,
+    })
+
+
+@read_replica
+@conditional_page('category:{category_slug}', scheduled=True)
+@cache_for_anonymous('category:{category_slug}')
 def category_posts(request, category_slug):
     """Отображение всех публикаций определённой категории."""
     category = get_object_or_404(
@@ -97,7 +212,12 @@ def category_posts(request, category_slug):
     post_list = get_base_queryset(
         manager=category.posts,
     )
-    page_obj = get_paginated_page(request, post_list)
+    page_obj = get_paginated_page(
+        request,
+        post_list,
+        keyset=settings.BLOG_KEYSET_PAGINATION,
+        count_key=get_feed_count_key(f'category:{category.pk}'),
+    )
     return render(
         request,
         "blog/category.html",
@@ -105,7 +225,22 @@ def category_posts(request, category_slug):
     )
 
 
-class CreatePostView(LoginRequiredMixin, CreateView):
+def search(request):
+    """Поиск по заголовкам и текстам опубликованных постов."""
+    query = request.GET.get('q', '').strip()[:SEARCH_QUERY_MAX_LENGTH]
+    page_obj = None
+    if query:
+        page_obj = get_paginated_page(
+            request, search_posts(get_base_queryset(), query)
+        )
+    return render(request, 'blog/search.html', {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    })
+
+
+class CreatePostView(LoginRequiredMixin, PostJobsMixin, CreateView):
     """Создание публикации."""
 
     model = Post
@@ -123,7 +258,12 @@ class CreatePostView(LoginRequiredMixin, CreateView):
         )
 
 
-class EditPostView(LoginRequiredMixin, CheckAuthorMixin, UpdateView):
+class EditPostView(
+    LoginRequiredMixin,
+    CheckAuthorMixin,
+    PostJobsMixin,
+    UpdateView
+):
     """Редактирование публикации."""
 
     model = Post
@@ -212,6 +352,8 @@ class DeleteCommentView(
 # Пользователи
 
 
+@read_replica
+@conditional_page('author:{username}', scheduled=True)
 def profile_view(request, username):
     """Профиль пользователя с подробной информацией."""
     profile = get_object_or_404(User, username=username)
@@ -220,7 +362,15 @@ def profile_view(request, username):
         manager=profile.posts,
         filter_published=not is_owner,
     )
-    page_obj = get_paginated_page(request, publications)
+    page_obj = get_paginated_page(
+        request,
+        publications,
+        keyset=settings.BLOG_KEYSET_PAGINATION,
+        count_key=get_feed_count_key(
+            f'author:{profile.pk}',
+            scope='owner' if is_owner else 'public',
+        ),
+    )
     context = {
         'profile': profile,
         'page_obj': page_obj,
@@ -236,3 +386,21 @@ def edit_profile(request):
         form.save()
         return redirect('blog:profile', username=request.user.username)
     return render(request, 'blog/user.html', {'form': form})
+
+
+# Производительность
+
+
+def performance_report(request):
+    """Сводка PerformanceMiddleware для персонала в админке."""
+    sort = request.GET.get('sort')
+    report = get_report(sort=sort if sort in METRICS else 'total_time')
+    for row in report:
+        row['metrics'] = [
+            (row[f'{name}_avg'], row[f'{name}_max']) for name in METRICS
+        ]
+    return render(request, 'blog/performance.html', {
+        'report': report,
+        'metric_labels': METRICS.values(),
+        'title': 'Производительность видов',
+    })
@@ -44,11 +44,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.PrimaryPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,6 +88,23 @@ DATABASES = {
     }
 }
 
+# Реплика для чтения лент и страниц постов. Локально это может быть
+# копия db.sqlite3: BLOG_REPLICA_DB=db_replica.sqlite3.
+if os.getenv('BLOG_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / os.getenv('BLOG_REPLICA_DB'),
+        # В тестах реплика указывает на тестовую основную базу.
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+BLOG_DATABASE_REPLICAS = ['replica']
+
+# Сколько секунд после записи сессия читает с основной базы.
+BLOG_PRIMARY_PIN_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -116,3 +135,35 @@ STATICFILES_DIRS = [
 ]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+BLOG_KEYSET_PAGINATION = False
+
+BLOG_FEED_COUNT_TIMEOUT = 60 * 60
+
+# Главная лента: при числе постов больше ESTIMATED_COUNT_THRESHOLD
+# показывать оценку количества страниц вместо точного COUNT(*).
+BLOG_ESTIMATED_FEED_COUNT = True
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Сколько дней хранить журнал ChangeLogEntry после выгрузки export_blog
+# с --watermark. По журналу считается и Last-Modified страницы поста.
+BLOG_CHANGELOG_RETENTION_DAYS = 30
+
+# Асинхронные виды лент и страницы поста (blog.async_views) для запуска
+# под ASGI; под WSGI синхронные быстрее.
+BLOG_ASYNC_VIEWS = os.getenv(
+    'BLOG_ASYNC_VIEWS', ''
+).lower() in ('1', 'true', 'yes')
+
+BLOG_PERFORMANCE_MONITORING = os.getenv(
+    'BLOG_PERFORMANCE_MONITORING', ''
+).lower() in ('1', 'true', 'yes')
+
+# Бюджеты видов: 'default' действует для всех, ключи — имена URL.
+# Метрики: queries, sql_time, render_time, total_time (мс), size (байт).
+BLOG_PERFORMANCE_BUDGETS = {
+    'default': {'queries': 20, 'total_time': 300},
+    'blog:post_detail': {'queries': 10},
+    'blog:index': {'queries': 10},
+}
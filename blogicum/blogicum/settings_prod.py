@@ -0,0 +1,142 @@
+"""
+Настройки для продакшена: DJANGO_SETTINGS_MODULE=blogicum.settings_prod.
+
+Соединения с базой не открываются заново на каждый запрос.
+С POSTGRES_DB используется PostgreSQL с пулом соединений Django 5.1
+(нужен пакет psycopg[pool]) или, при DB_POOL=0, постоянные соединения
+с проверкой перед запросом. Без него — SQLite в режиме WAL для
+развёртывания на одном сервере.
+
+Кеш обязан быть общим для всех процессов: с REDIS_URL — Redis (нужен
+пакет redis, годится для нескольких серверов), без него — файловый
+кеш в CACHE_DIR для процессов одного сервера. Проверяется командой
+manage.py check --deploy.
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost').split(',')
+
+# Шаблоны читаются с диска и компилируются один раз на процесс.
+# Загрузчики указаны явно, поэтому APP_DIRS выключен: шаблоны
+# приложений ищет app_directories.Loader.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            # Без DEBUG этот обработчик ничего не добавляет.
+            if processor != 'django.template.context_processors.debug'
+        ],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Сколько секунд держать постоянное соединение открытым.
+CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 600))
+
+# Каждая прагма выполняется при открытии соединения, то есть с
+# постоянными соединениями — один раз на процесс, а не на запрос.
+SQLITE_PRAGMAS = (
+    # Читатели не блокируют писателя и наоборот.
+    'PRAGMA journal_mode=WAL',
+    # В режиме WAL fsync на каждую транзакцию не нужен для целостности.
+    'PRAGMA synchronous=NORMAL',
+    # Ждать освобождения блокировки вместо ошибки database is locked.
+    'PRAGMA busy_timeout=5000',
+    # Читать файл базы через mmap, без копирования в страничный кеш.
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+def sqlite_database(name):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS),
+            # Запись берёт блокировку сразу: иначе транзакция, начавшая
+            # с чтения, получает database is locked без ожидания.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+
+
+def postgresql_database(name):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': name,
+        'USER': os.getenv('POSTGRES_USER', 'blogicum'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', 'localhost'),
+        'PORT': os.getenv('DB_PORT', '5432'),
+    }
+    if os.getenv('DB_POOL', '1') == '1':
+        # Пул несовместим с CONN_MAX_AGE: соединение возвращается
+        # в пул в конце запроса.
+        database['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+                'timeout': 10,
+            },
+        }
+    else:
+        database['CONN_MAX_AGE'] = CONN_MAX_AGE
+        database['CONN_HEALTH_CHECKS'] = True
+    return database
+
+
+DATABASES = dict(DATABASES)
+
+if os.getenv('POSTGRES_DB'):
+    DATABASES['default'] = postgresql_database(os.getenv('POSTGRES_DB'))
+    if os.getenv('DB_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **postgresql_database(os.getenv('POSTGRES_DB')),
+            'HOST': os.getenv('DB_REPLICA_HOST'),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES['default'] = sqlite_database(BASE_DIR / 'db.sqlite3')
+    if 'replica' in DATABASES:
+        DATABASES['replica'] = {
+            **sqlite_database(DATABASES['replica']['NAME']),
+            'TEST': DATABASES['replica']['TEST'],
+        }
+
+# На кеше держатся версии групп, которые сбрасывают сигналы моделей,
+# счётчики лент, ETag и метки отставания реплик. С кешем в памяти
+# процесса правка сбросила бы его только в обработавшем её процессе,
+# а остальные без срока отдавали бы устаревшие страницы и ответы 304.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', BASE_DIR / 'cache'),
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        },
+    }
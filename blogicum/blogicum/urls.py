@@ -12,6 +12,11 @@ handler500 = 'pages.views.server_error'
 
 
 urlpatterns = [
+    path(
+        'admin/performance/',
+        admin.site.admin_view(views.performance_report),
+        name='performance_report'
+    ),
     path('admin/', admin.site.urls),
     path('accounts/profile/', views.IndexListView.as_view(), name='index'),
     path('auth/', include('django.contrib.auth.urls')),
@@ -1,13 +1,55 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from django.conf import settings
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from blog.decorators import cache_for_anonymous, conditional_page
+
+
+def get_templates_mtime():
+    """Время изменения самого свежего файла в каталоге шаблонов."""
+    return max(
+        path.stat().st_mtime
+        for path in settings.TEMPLATES_DIR.rglob('*')
+        if path.is_file()
+    )
+
+
+get_deployed_templates_mtime = lru_cache(maxsize=None)(get_templates_mtime)
+
+
+def get_templates_last_modified(request):
+    """
+    Last-Modified статичных страниц.
+
+    Их содержимое меняется только вместе с шаблонами, то есть
+    с выкладкой; без DEBUG каталог просматривается раз на процесс.
+    """
+    mtime = (
+        get_templates_mtime() if settings.DEBUG
+        else get_deployed_templates_mtime()
+    )
+    return datetime.fromtimestamp(mtime, tz=timezone.utc)
+
+
+static_page = conditional_page(
+    'static', last_modified=get_templates_last_modified
+)
+
 
+@method_decorator(static_page, name='dispatch')
+@method_decorator(cache_for_anonymous('static'), name='dispatch')
 class About(TemplateView):
     """Страница с информацией о Блогикуме."""
 
     template_name = 'pages/about.html'
 
 
+@method_decorator(static_page, name='dispatch')
+@method_decorator(cache_for_anonymous('static'), name='dispatch')
 class Rules(TemplateView):
     """Страница с правилами Блогикума."""
 
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings
+
+
+@pytest.fixture
+def prod_manage(tmp_path):
+    """
+    Запускает manage.py в отдельном процессе с настройками продакшена.
+
+    Тестовая база находится в памяти одного процесса, поэтому команды,
+    которым нужны настоящие соединения или дочерние процессы, работают
+    с базой в файле во временном каталоге. База уже мигрирована.
+    """
+    (tmp_path / "prod_test_settings.py").write_text(
+        "from blogicum.settings_prod import *  # noqa\n"
+        "DATABASES = {'default': sqlite_database(%r)}\n"
+        % str(tmp_path / "db.sqlite3")
+    )
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "prod_test_settings",
+        "PYTHONPATH": str(tmp_path),
+        "SECRET_KEY": "prod-test",
+        "CACHE_DIR": str(tmp_path / "cache"),
+        "DJANGO_SUPERUSER_USERNAME": "admin",
+        "DJANGO_SUPERUSER_PASSWORD": "admin",
+        "DJANGO_SUPERUSER_EMAIL": "admin@example.com",
+    }
+    for name in ("POSTGRES_DB", "DB_POOL", "DB_CONN_MAX_AGE"):
+        env.pop(name, None)
+
+    def manage(*args):
+        return subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / "manage.py"), *args],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+
+    manage("migrate", "--verbosity=0")
+    return manage
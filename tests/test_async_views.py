@@ -0,0 +1,113 @@
+import re
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import resolve
+from django.utils.html import escape
+
+from blog.management.commands.benchmark_async import reload_urlconf
+
+
+# CSRF-токен маскируется заново при каждом рендеринге.
+CSRF_TOKEN = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+@pytest.fixture
+def switch_views(settings):
+    def switch(async_views):
+        settings.BLOG_ASYNC_VIEWS = async_views
+        reload_urlconf()
+    yield switch
+    switch(False)
+
+
+@pytest.fixture
+def async_views(switch_views):
+    switch_views(True)
+
+
+def get_body(response):
+    assert response.status_code == 200
+    return CSRF_TOKEN.sub("", response.content.decode())
+
+
+@pytest.mark.django_db
+def test_async_views_render_same_pages(
+    switch_views, client, user, user_client, post_with_published_location,
+    comment_to_a_post,
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        "/?page=7",
+    )
+    sync_bodies = [get_body(user_client.get(url)) for url in urls]
+    switch_views(True)
+    for url in urls:
+        assert iscoroutinefunction(resolve(url.partition("?")[0]).func), (
+            "Убедитесь, что при BLOG_ASYNC_VIEWS ленты и страница поста"
+            " обслуживаются асинхронными видами."
+        )
+    async_client = AsyncClient()
+    async_client.cookies = user_client.cookies
+    for url, sync_body in zip(urls, sync_bodies):
+        body = get_body(async_to_sync(async_client.get)(url))
+        assert post.title in body, url
+        assert user.username in body, url
+        assert body == sync_body, (
+            "Убедитесь, что асинхронный вид отдаёт ту же страницу, что"
+            f" и синхронный: {url}"
+        )
+    response = async_to_sync(async_client.get)(f"/posts/{post.id}/")
+    first_line = escape(comment_to_a_post.text.splitlines()[0])
+    assert first_line in response.content.decode()
+    assert client.get("/posts/0/").status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_async(user, post_with_published_location):
+    out = StringIO()
+    call_command(
+        "benchmark_async", requests=4, concurrency=2, stdout=out
+    )
+    output = out.getvalue()
+    assert "wsgi_sync" in output and "asgi_async" in output
+    assert "{200: 4}" in output, (
+        "Убедитесь, что оба режима замера отдают страницы без ошибок."
+    )
+
+
+@pytest.mark.django_db
+def test_async_pages_are_cached_for_anonymous(
+    async_views, django_assert_num_queries, post_with_published_location
+):
+    get = async_to_sync(AsyncClient().get)
+    first = get("/")
+    assert post_with_published_location.title in first.content.decode()
+    with django_assert_num_queries(0):
+        second = get("/")
+    assert second.content == first.content, (
+        "Убедитесь, что асинхронные виды тоже берут страницы анонимных"
+        " посетителей из кеша."
+    )
+
+
+@pytest.mark.django_db
+def test_async_pages_answer_not_modified(
+    async_views, post_with_published_location
+):
+    get = async_to_sync(AsyncClient().get)
+    post = post_with_published_location
+    for url in (f"/posts/{post.id}/", f"/profile/{post.author.username}/"):
+        etag = get(url).headers["ETag"]
+        response = get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304, (
+            "Убедитесь, что асинхронные виды тоже отвечают 304, если"
+            " страница у клиента не устарела."
+        )
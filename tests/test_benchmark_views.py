@@ -0,0 +1,49 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_seed_and_benchmark_views(tmp_path, django_user_model):
+    call_command(
+        "seed_blog", users=5, posts=40, comments=200, categories=3,
+        locations=2, stdout=StringIO(),
+    )
+    assert Post.objects.count() == 40
+    assert Comment.objects.count() == 200
+
+    output = tmp_path / "result.json"
+    call_command(
+        "benchmark_views", requests=3, warmup=1, output=output,
+        stdout=StringIO(),
+    )
+    data = json.loads(output.read_text(encoding="utf-8"))
+    assert set(data["scenarios"]) == {
+        "index", "category", "profile", "detail", "comment",
+        "admin_posts", "admin_comments",
+    }
+    for name, result in data["scenarios"].items():
+        expected = "302" if name == "comment" else "200"
+        assert result["statuses"] == {expected: 4}, (
+            f"Убедитесь, что сценарий `{name}` отвечает статусом"
+            f" {expected}."
+        )
+        assert result["p50_ms"] <= result["p99_ms"]
+    assert Comment.objects.count() == 200, (
+        "Убедитесь, что комментарии, созданные при замере, удаляются."
+    )
+    assert not django_user_model.objects.filter(is_staff=True).exists(), (
+        "Убедитесь, что права для замера админки откатываются."
+    )
+
+    out = StringIO()
+    call_command(
+        "benchmark_views", requests=2, warmup=0, anonymous=True,
+        compare=output, stdout=out,
+    )
+    assert "Сравнение" in out.getvalue()
@@ -0,0 +1,80 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import serializers
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def fixture_file(tmp_path, mixer, user):
+    old = timezone.now() - timedelta(days=365)
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category__is_published=True, location__is_published=True,
+    )
+    mixer.cycle(3).blend(Comment, post=post, author=user)
+    Post.objects.update(created_at=old, updated_at=old)
+    objects = [
+        *Comment.objects.all(),
+        *Post.objects.all(),
+        *Category.objects.all(),
+        *Location.objects.all(),
+        user,
+    ]
+    path = tmp_path / "dump.json"
+    path.write_text(serializers.serialize("json", objects, indent=2))
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    return path, post.pk, old
+
+
+def test_bulk_loaddata_restores_dump(fixture_file):
+    path, post_id, old = fixture_file
+    out = StringIO()
+    call_command("bulk_loaddata", str(path), batch_size=2, stdout=out)
+
+    post = Post.objects.get(pk=post_id)
+    assert post.comments.count() == 3
+    assert post.comment_count == 3, (
+        "Убедитесь, что после загрузки пересчитывается"
+        " `Post.comment_count`."
+    )
+    # JSON-сериализатор хранит время с точностью до миллисекунд.
+    assert post.created_at.date() == post.updated_at.date() == old.date(), (
+        "Убедитесь, что даты `auto_now`/`auto_now_add` берутся"
+        " из фикстуры, а не заменяются текущим временем."
+    )
+    assert "строк/с" in out.getvalue()
+
+    # Повторная загрузка перезаписывает строки, как loaddata.
+    call_command("bulk_loaddata", str(path), stdout=StringIO())
+    assert Comment.objects.count() == 3
+
+
+def test_bulk_loaddata_fills_missing_fields(tmp_path, user):
+    path = tmp_path / "old.json"
+    path.write_text(json.dumps([{
+        "model": "blog.category",
+        "pk": 10,
+        "fields": {
+            "created_at": "2022-12-18T23:03:52.159Z",
+            "is_published": True,
+            "title": "Старая",
+            "slug": "old",
+            "description": "",
+        },
+    }]))
+    call_command("bulk_loaddata", str(path), stdout=StringIO())
+    category = Category.objects.get(pk=10)
+    assert category.updated_at is not None, (
+        "Убедитесь, что поля, которых нет в старой фикстуре,"
+        " получают значения."
+    )
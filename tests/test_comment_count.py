@@ -0,0 +1,63 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+    user_client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что добавление комментария увеличивает"
+        " `Post.comment_count`."
+    )
+
+    comment = CommentModel.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что удаление комментария уменьшает"
+        " `Post.comment_count`."
+    )
+
+
+def test_comment_count_follows_model_and_admin(
+    mixer, admin_client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    other_post = mixer.blend(type(post), category=post.category)
+    comments = mixer.cycle(3).blend(CommentModel, post=post)
+    comments[0].delete()
+    comments[1].post = other_post
+    comments[1].save()
+    admin_client.post(
+        f"/admin/blog/comment/{comments[2].id}/delete/", {"post": "yes"}
+    )
+    post.refresh_from_db()
+    other_post.refresh_from_db()
+    assert (post.comment_count, other_post.comment_count) == (0, 1), (
+        "Убедитесь, что `Post.comment_count` меняется при добавлении,"
+        " переносе и удалении комментария не только через виды,"
+        " но и через модель и админку."
+    )
+
+
+def test_recount_comments_repairs_counter(
+    mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(CommentModel, post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=0)
+
+    call_command("recount_comments", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " `Post.comment_count`."
+    )
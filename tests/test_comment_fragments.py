@@ -0,0 +1,62 @@
+import pytest
+
+from blog.constants import COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def busy_post(mixer, user, CommentModel):
+    post = mixer.blend(
+        "blog.Post", is_published=True, category__is_published=True
+    )
+    CommentModel.objects.bulk_create(
+        CommentModel(post=post, author=user, text=f"Комментарий {n}")
+        for n in range(COMMENTS_PER_PAGE * 2 + 5)
+    )
+    return post
+
+
+def test_comments_json_pages_cover_thread(client, busy_post, CommentModel):
+    url = f"/posts/{busy_post.id}/comments/?format=json"
+    ids = []
+    while url:
+        data = client.get(url).json()
+        ids += [comment["id"] for comment in data["comments"]]
+        url = data["next"]
+    expected = list(
+        CommentModel.objects.filter(post=busy_post)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+    assert ids == expected, (
+        "Убедитесь, что порции комментариев по `?after=<id>` идут подряд,"
+        " без пропусков и повторов."
+    )
+
+
+def test_comments_html_fragment(client, busy_post, CommentModel):
+    first = CommentModel.objects.filter(post=busy_post).order_by(
+        "created_at", "id"
+    )[COMMENTS_PER_PAGE - 1]
+    response = client.get(
+        f"/posts/{busy_post.id}/comments/?after={first.id}"
+    )
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "<form" not in content and "<html" not in content, (
+        "Убедитесь, что эндпоинт комментариев отдаёт фрагмент без формы"
+        " и разметки страницы."
+    )
+    assert f"Комментарий {COMMENTS_PER_PAGE}\n" in content
+    assert "data-comments-url" in content, (
+        "Убедитесь, что фрагмент содержит ссылку на следующую порцию."
+    )
+
+
+def test_comments_of_hidden_post_not_found(client, mixer):
+    post = mixer.blend("blog.Post", is_published=False)
+    response = client.get(f"/posts/{post.id}/comments/")
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарии неопубликованного поста недоступны."
+    )
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_detail_queries(client, post):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    return len(queries), response
+
+
+def test_comments_do_not_cause_n_plus_one(
+    user_client, mixer, CommentModel, django_user_model
+):
+    quiet_post = mixer.blend(
+        "blog.Post", is_published=True, category__is_published=True
+    )
+    busy_post = mixer.blend(
+        "blog.Post", is_published=True, category__is_published=True
+    )
+    authors = mixer.cycle(20).blend(django_user_model)
+    mixer.blend(CommentModel, post=quiet_post, author=authors[0])
+    CommentModel.objects.bulk_create(
+        CommentModel(
+            post=busy_post, author=authors[n % len(authors)], text=str(n)
+        )
+        for n in range(1000)
+    )
+
+    quiet_queries, _ = count_detail_queries(user_client, quiet_post)
+    busy_queries, response = count_detail_queries(user_client, busy_post)
+    assert busy_queries == quiet_queries, (
+        "Убедитесь, что число запросов к БД на странице публикации"
+        " не зависит от числа комментариев и их авторов."
+    )
+    assert "all_comments" in response.content.decode(), (
+        "Убедитесь, что длинное обсуждение выводится не целиком, а"
+        " со ссылкой «Показать все комментарии»."
+    )
+
+    response = user_client.get(f"/posts/{busy_post.id}/?all_comments=1")
+    assert len(response.context["comments"]) == 1000, (
+        "Убедитесь, что параметр `all_comments` выводит все комментарии."
+    )
+
+
+def test_all_comments_page_is_cached_separately(
+    client, mixer, CommentModel, django_user_model
+):
+    post = mixer.blend(
+        "blog.Post", is_published=True, category__is_published=True
+    )
+    author = mixer.blend(django_user_model)
+    CommentModel.objects.bulk_create(
+        CommentModel(post=post, author=author, text=str(n))
+        for n in range(50)
+    )
+    short = client.get(f"/posts/{post.id}/")
+    full = client.get(f"/posts/{post.id}/?all_comments=1")
+    assert len(full.context["comments"]) == 50, (
+        "Убедитесь, что страница со всеми комментариями не берётся из"
+        " кеша сокращённой страницы."
+    )
+    assert client.get(f"/posts/{post.id}/").content == short.content
@@ -0,0 +1,241 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def old_post(post_with_published_location):
+    """Пост, который со всеми связанными объектами менялся час назад."""
+    post = post_with_published_location
+    hour_ago = timezone.now() - timedelta(hours=1)
+    # update() обходит auto_now.
+    Post.objects.filter(pk=post.pk).update(updated_at=hour_ago)
+    Category.objects.filter(pk=post.category_id).update(updated_at=hour_ago)
+    Location.objects.filter(pk=post.location_id).update(updated_at=hour_ago)
+    Comment.objects.filter(post=post).update(created_at=hour_ago)
+    return post
+
+
+def test_unchanged_page_returns_not_modified(
+    client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = ("/", f"/posts/{post.id}/", f"/category/{post.category.slug}/")
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        etag = response.headers.get("ETag")
+        assert etag, (
+            "Убедитесь, что ленты и страница публикации отдают заголовок"
+            " ETag."
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            "Убедитесь, что при совпадении If-None-Match страница не"
+            " отдаётся заново, а возвращается ответ 304."
+        )
+        assert not response.content
+
+
+def test_not_modified_does_not_render(
+    user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    # Первый ответ выдаёт cookie CSRF, от которой зависит ETag.
+    user_client.get(url)
+    etag = user_client.get(url).headers["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.templates == []
+    assert not any("blog_comment" in query["sql"] for query in queries), (
+        "Убедитесь, что при ответе 304 комментарии не загружаются."
+    )
+
+
+def test_etag_changes_with_content(
+    user_client, post_with_published_location, comment_to_a_post
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    etag = user_client.get(url).headers["ETag"]
+    comment_to_a_post.text = "Новый текст комментария"
+    comment_to_a_post.save()
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после изменения комментария страница публикации"
+        " отдаётся заново."
+    )
+    assert response.headers["ETag"] != etag
+
+    etag = user_client.get("/").headers["ETag"]
+    post.title = "Новый заголовок"
+    post.save()
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после изменения публикации лента отдаётся заново."
+    )
+
+
+def test_etag_depends_on_user(
+    client, user_client, another_user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etags = {
+        test_client.get(url).headers["ETag"]
+        for test_client in (client, user_client, another_user_client)
+    }
+    assert len(etags) == 3, (
+        "Убедитесь, что ETag страницы различается для разных"
+        " пользователей: их страницы отличаются."
+    )
+
+
+def test_last_modified(client, old_post):
+    urls = (f"/posts/{old_post.id}/", "/pages/about/")
+    for url in urls:
+        response = client.get(url)
+        last_modified = response.headers.get("Last-Modified")
+        assert last_modified, (
+            "Убедитесь, что страница публикации и статичные страницы"
+            " отдают заголовок Last-Modified."
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304, url
+
+
+def test_last_modified_is_not_sent_within_the_same_second(
+    client, post_with_published_location
+):
+    response = client.get(f"/posts/{post_with_published_location.id}/")
+    assert "Last-Modified" not in response.headers, (
+        "Убедитесь, что Last-Modified не отдаётся, пока не прошла секунда"
+        " изменения: правку в ту же секунду по нему не заметить."
+    )
+
+
+@pytest.mark.parametrize("change", ("save", "delete", "create"))
+def test_comment_changes_update_last_modified(
+    client, user, comment_to_a_post, old_post, change
+):
+    Comment.objects.filter(pk=comment_to_a_post.pk).update(
+        created_at=old_post.pub_date - timedelta(hours=1)
+    )
+    url = f"/posts/{old_post.id}/"
+    last_modified = client.get(url).headers["Last-Modified"]
+    # Как из админки: без видов комментариев и без правки поста.
+    if change == "save":
+        comment_to_a_post.text = "Исправленный текст"
+        comment_to_a_post.save()
+    elif change == "delete":
+        comment_to_a_post.delete()
+    else:
+        Comment.objects.create(post=old_post, author=user, text="Новый")
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200, (
+        "Убедитесь, что Last-Modified страницы поста учитывает"
+        " добавление, правку и удаление комментариев."
+    )
+
+
+def test_comment_edit_keeps_post_card(
+    user, user_client, comment_to_a_post, old_post
+):
+    Comment.objects.filter(pk=comment_to_a_post.pk).update(author=user)
+    card_version = Post.objects.get(pk=old_post.pk).card_version
+    response = user_client.post(
+        f"/posts/{old_post.id}/edit_comment/{comment_to_a_post.id}/",
+        {"text": "Исправленный текст"},
+    )
+    assert response.status_code == 302
+    assert Post.objects.get(pk=old_post.pk).card_version == card_version, (
+        "Убедитесь, что правка комментария не сбрасывает кеш карточки"
+        " поста."
+    )
+
+
+def test_etag_changes_with_csrf_secret(user_client, old_post):
+    url = f"/posts/{old_post.id}/"
+    user_client.get(url)
+    etag = user_client.get(url).headers["ETag"]
+    # Вход в систему выдаёт новый секрет CSRF.
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(32)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после смены секрета CSRF страница с формой"
+        " отдаётся заново, а не ответом 304 со старым токеном."
+    )
+
+
+def test_cached_anonymous_page_gets_own_etag(post_with_published_location):
+    post = post_with_published_location
+    first, second = Client(), Client()
+    for test_client in (first, second):
+        test_client.cookies[settings.CSRF_COOKIE_NAME] = get_random_string(
+            32
+        )
+    urls = ("/", f"/posts/{post.id}/", f"/category/{post.category.slug}/")
+    for url in urls:
+        first_etag = first.get(url).headers["ETag"]
+        # Второй посетитель получает страницу из кеша первого.
+        etag = second.get(url).headers["ETag"]
+        assert etag != first_etag, (
+            "Убедитесь, что страница из кеша для анонимных посетителей"
+            " отдаётся с ETag текущего посетителя, а не первого."
+        )
+        response = second.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, url
+
+
+def test_etag_changes_when_author_is_renamed(
+    client, user, post_with_published_location
+):
+    urls = ("/", f"/posts/{post_with_published_location.id}/")
+    etags = {url: client.get(url).headers["ETag"] for url in urls}
+    user.username = "renamed_author"
+    user.save()
+    for url, etag in etags.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            "Убедитесь, что после смены имени пользователя страницы с его"
+            " именем отдаются заново."
+        )
+        assert "@renamed_author" in response.content.decode()
+
+
+def test_profile_answers_not_modified(
+    client, user, mixer, post_with_published_location
+):
+    url = f"/profile/{user.username}/"
+    etag = client.get(url).headers.get("ETag")
+    assert etag, "Убедитесь, что страница профиля отдаёт заголовок ETag."
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=post_with_published_location.category,
+        pub_date=timezone.now() - timedelta(hours=1),
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что новая публикация автора меняет ETag его профиля."
+    )
+
+    etag = response.headers["ETag"]
+    user.first_name = "Новое имя"
+    user.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что изменение данных пользователя меняет ETag его"
+        " профиля."
+    )
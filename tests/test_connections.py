@@ -0,0 +1,84 @@
+import importlib
+import re
+
+from blog.checks import PROCESS_LOCAL_CACHES, check_shared_cache
+
+
+def load_prod_settings(monkeypatch, **env):
+    for name in ("POSTGRES_DB", "DB_POOL", "DB_REPLICA_HOST", "REDIS_URL"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    from blogicum import settings_prod
+    return importlib.reload(settings_prod)
+
+
+def test_prod_settings_keep_connections(monkeypatch):
+    prod = load_prod_settings(monkeypatch)
+    database = prod.DATABASES["default"]
+    assert database["CONN_MAX_AGE"] > 0 and database["CONN_HEALTH_CHECKS"], (
+        "Убедитесь, что в продакшене соединение с SQLite не открывается"
+        " заново на каждый запрос."
+    )
+    assert "journal_mode=WAL" in database["OPTIONS"]["init_command"]
+    assert "busy_timeout" in database["OPTIONS"]["init_command"]
+    assert "mmap_size" in database["OPTIONS"]["init_command"]
+
+    prod = load_prod_settings(monkeypatch, POSTGRES_DB="blogicum")
+    database = prod.DATABASES["default"]
+    assert database["ENGINE"] == "django.db.backends.postgresql"
+    assert database["OPTIONS"]["pool"]["max_size"] > 0, (
+        "Убедитесь, что для PostgreSQL включён пул соединений."
+    )
+    assert not database.get("CONN_MAX_AGE"), (
+        "Пул соединений Django несовместим с CONN_MAX_AGE."
+    )
+
+    prod = load_prod_settings(
+        monkeypatch, POSTGRES_DB="blogicum", DB_POOL="0"
+    )
+    database = prod.DATABASES["default"]
+    assert "pool" not in database.get("OPTIONS", {})
+    assert database["CONN_MAX_AGE"] > 0 and database["CONN_HEALTH_CHECKS"]
+
+
+def test_prod_settings_use_shared_cache(monkeypatch, settings):
+    prod = load_prod_settings(monkeypatch)
+    assert prod.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES, (
+        "Убедитесь, что в продакшене кеш общий для всех процессов:"
+        " на нём держатся версии, которые сбрасывают сигналы."
+    )
+    prod = load_prod_settings(monkeypatch, REDIS_URL="redis://cache:6379")
+    assert prod.CACHES["default"]["BACKEND"].endswith("RedisCache")
+
+    assert [error.id for error in check_shared_cache(None)] == ["blog.W001"]
+    settings.CACHES = prod.CACHES
+    assert check_shared_cache(None) == []
+
+
+def test_cache_versions_are_shared_between_processes(prod_manage):
+    command = (
+        "from blog.utils import get_cache_versions;"
+        " print(get_cache_versions('page'))"
+    )
+    assert prod_manage("shell", "-c", command) == prod_manage(
+        "shell", "-c", command
+    ), (
+        "Убедитесь, что версии групп кеша, которые сбрасывают сигналы,"
+        " видны всем процессам."
+    )
+
+
+def test_benchmark_connections(prod_manage):
+    # Соединение с тестовой базой в памяти Django не закрывает
+    # ни в одном режиме, поэтому замер идёт в отдельном процессе.
+    prod_manage("createsuperuser", "--noinput")
+    output = prod_manage("benchmark_connections", "--requests=3", "--warmup=1")
+    opened = dict(
+        re.findall(r"^(\w+) .*новых соединений: (\d+)$", output, re.M)
+    )
+    assert opened == {"per_request": "3", "configured": "0"}, (
+        "Убедитесь, что с CONN_MAX_AGE соединение переиспользуется между"
+        " запросами, а без него открывается на каждый запрос."
+    )
+    assert "Экономия на запрос" in output
@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.utils import timezone
+
+from blog import pagination
+from blog.pagination import EstimatedCountPaginator
+from blog.utils import get_base_queryset
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed(mixer, user, monkeypatch):
+    monkeypatch.setattr(EstimatedCountPaginator, "threshold", 20)
+    category = mixer.blend("blog.Category", is_published=True)
+    now = timezone.now()
+    posts = mixer.cycle(45).blend(
+        "blog.Post", author=user, category=category, is_published=True,
+        location=None,
+        pub_date=mixer.sequence(lambda n: now - timedelta(hours=n + 1)),
+    )
+    # Скрытые посты попадают в статистику таблицы, но не в ленту:
+    # с ними в таблице на три страницы больше.
+    mixer.cycle(30).blend(
+        "blog.Post", author=user, category=category, is_published=False,
+        location=None,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return posts
+
+
+def test_index_shows_estimated_page_count(client, feed):
+    response = client.get("/")
+    page_obj = response.context["page_obj"]
+    assert page_obj.paginator.is_estimated, (
+        "Убедитесь, что для большой ленты на главной странице берётся"
+        " оценка количества постов, а не точный COUNT(*)."
+    )
+    assert page_obj.paginator.count <= 45, (
+        "Убедитесь, что оценка строится по запросу ленты, а не по всей"
+        " таблице со скрытыми постами."
+    )
+    # Оценки запроса на SQLite нет: известно лишь, что постов больше
+    # порога, и выводится нижняя граница, а не «≈».
+    content = response.content.decode()
+    assert "из 3 и более" in content and "≈" not in content, (
+        "Убедитесь, что без оценки планировщика в пагинаторе выводится"
+        " нижняя граница числа страниц, а не приблизительное число."
+    )
+
+    response = client.get("/?page=5")
+    page_obj = response.context["page_obj"]
+    assert len(page_obj) == 5 and not page_obj.has_next(), (
+        "Убедитесь, что последняя страница определяется по данным,"
+        " а не по оценке."
+    )
+    for page in (6, 7):
+        response = client.get(f"/?page={page}")
+        assert response.status_code == 200
+        assert response.context["page_obj"].number == 5, (
+            "Убедитесь, что страница за концом ленты не ломает пагинацию."
+        )
+
+
+def test_planner_estimate_is_shown_as_approximate(
+    client, feed, monkeypatch
+):
+    monkeypatch.setattr(pagination, "estimate_query_rows", lambda qs: 44)
+    response = client.get("/")
+    assert not response.context["page_obj"].paginator.is_lower_bound
+    assert "из ≈5" in response.content.decode(), (
+        "Убедитесь, что оценка планировщика выводится как приблизительное"
+        " число страниц."
+    )
+
+
+def test_overestimate_falls_back_to_last_page(client, feed, monkeypatch):
+    # Оценка планировщика, завышенная на три страницы.
+    monkeypatch.setattr(pagination, "estimate_query_rows", lambda qs: 75)
+    response = client.get("/?page=6")
+    page_obj = response.context["page_obj"]
+    assert page_obj.number == 5 and len(page_obj) == 5, (
+        "Убедитесь, что при завышенной оценке страница за концом ленты"
+        " показывает последнюю страницу с постами, а не первую."
+    )
+    content = response.content.decode()
+    assert "из ≈" not in content and "и более" not in content, (
+        "Убедитесь, что после пустой страницы оценка заменяется точным"
+        " количеством."
+    )
+
+    paginator = EstimatedCountPaginator(get_base_queryset(), 10)
+    assert paginator.num_pages == 8
+    page_obj = async_to_sync(paginator.aget_page)("7")
+    assert page_obj.number == 5 and len(page_obj) == 5, (
+        "Убедитесь, что асинхронные виды тоже показывают последнюю"
+        " страницу с постами."
+    )
+
+
+def test_small_feed_is_counted_exactly(client, feed, monkeypatch):
+    monkeypatch.setattr(EstimatedCountPaginator, "threshold", 100)
+    response = client.get("/")
+    paginator = response.context["page_obj"].paginator
+    assert not paginator.is_estimated and paginator.count == 45, (
+        "Убедитесь, что лента меньше порога считается точно."
+    )
+    assert "≈" not in response.content.decode()
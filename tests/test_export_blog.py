@@ -0,0 +1,172 @@
+import csv
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import ChangeLogEntry, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_export_jsonl_and_csv(tmp_path, post_with_published_location, mixer):
+    mixer.cycle(3).blend(Comment, post=post_with_published_location)
+    call_command("export_blog", str(tmp_path), stdout=StringIO())
+
+    posts = read_jsonl(tmp_path / "post.jsonl")
+    assert [row["id"] for row in posts] == [post_with_published_location.id]
+    assert posts[0]["author_id"] == post_with_published_location.author_id
+    assert len(read_jsonl(tmp_path / "comment.jsonl")) == 3
+    assert (tmp_path / "category.jsonl").exists()
+    assert (tmp_path / "location.jsonl").exists()
+
+    call_command(
+        "export_blog", str(tmp_path), format="csv", gzip=True,
+        models=["comment"], stdout=StringIO(),
+    )
+    with gzip.open(tmp_path / "comment.csv.gz", "rt", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 3 and "post_id" in rows[0], (
+        "Убедитесь, что CSV-выгрузка содержит заголовок и все строки."
+    )
+
+
+def test_incremental_export_uses_watermark(
+    tmp_path, post_with_published_location, mixer
+):
+    watermark = tmp_path / "watermark.json"
+    first, second = tmp_path / "first", tmp_path / "second"
+    call_command(
+        "export_blog", str(first), watermark=watermark, stdout=StringIO()
+    )
+    assert len(read_jsonl(first / "post.jsonl")) == 1
+
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        updated_at=timezone.now() - timedelta(days=1)
+    )
+    new_post = mixer.blend(
+        "blog.Post", is_published=True, category__is_published=True
+    )
+    call_command(
+        "export_blog", str(second), watermark=watermark, stdout=StringIO()
+    )
+    assert [row["id"] for row in read_jsonl(second / "post.jsonl")] == [
+        new_post.id
+    ], (
+        "Убедитесь, что с `--watermark` выгружаются только строки,"
+        " изменённые после прошлой выгрузки."
+    )
+
+
+def test_incremental_export_includes_new_comments(
+    tmp_path, post_with_published_location, mixer
+):
+    watermark = tmp_path / "watermark.json"
+    mixer.blend(Comment, post=post_with_published_location)
+    call_command(
+        "export_blog", str(tmp_path / "first"), watermark=watermark,
+        stdout=StringIO(),
+    )
+    comment = mixer.blend(Comment, post=post_with_published_location)
+    call_command(
+        "export_blog", str(tmp_path / "second"), watermark=watermark,
+        stdout=StringIO(),
+    )
+    rows = read_jsonl(tmp_path / "second" / "comment.jsonl")
+    assert [row["id"] for row in rows] == [comment.id]
+
+
+def test_incremental_export_includes_edits_and_deletions(
+    tmp_path, post_with_published_location, mixer
+):
+    watermark = tmp_path / "watermark.json"
+    edited, removed = mixer.cycle(2).blend(
+        Comment, post=post_with_published_location
+    )
+    call_command(
+        "export_blog", str(tmp_path / "first"), watermark=watermark,
+        stdout=StringIO(),
+    )
+    edited.text = "Исправленный комментарий"
+    edited.save()
+    removed_id = removed.id
+    removed.delete()
+    call_command(
+        "export_blog", str(tmp_path / "second"), watermark=watermark,
+        stdout=StringIO(),
+    )
+    rows = read_jsonl(tmp_path / "second" / "comment.jsonl")
+    assert [row["text"] for row in rows] == [edited.text], (
+        "Убедитесь, что инкрементальная выгрузка включает изменённые"
+        " комментарии."
+    )
+    deleted = read_jsonl(tmp_path / "second" / "deleted.jsonl")
+    assert [(row["model"], row["object_id"]) for row in deleted] == [
+        ("comment", removed_id)
+    ], "Убедитесь, что удалённые строки выгружаются в файл deleted."
+
+
+def test_cascaded_comment_deletions_are_logged_in_bulk(
+    tmp_path, post_with_published_location, mixer
+):
+    post = post_with_published_location
+    comment_ids = {
+        comment.id for comment in mixer.cycle(50).blend(Comment, post=post)
+    }
+    watermark = tmp_path / "watermark.json"
+    call_command(
+        "export_blog", str(tmp_path / "first"), watermark=watermark,
+        stdout=StringIO(),
+    )
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    assert len(queries) < 15, (
+        "Убедитесь, что комментарии удаляемого поста пишутся в журнал"
+        " изменений одним запросом, а не по одному."
+    )
+    call_command(
+        "export_blog", str(tmp_path / "second"), watermark=watermark,
+        stdout=StringIO(),
+    )
+    deleted = read_jsonl(tmp_path / "second" / "deleted.jsonl")
+    assert {
+        row["object_id"] for row in deleted if row["model"] == "comment"
+    } == comment_ids
+    assert [row["model"] for row in deleted].count("comment") == 50
+
+
+def test_watermark_export_prunes_old_changelog(
+    tmp_path, settings, post_with_published_location, mixer
+):
+    old, recent = mixer.cycle(2).blend(
+        Comment, post=post_with_published_location
+    )
+    old.delete()
+    ChangeLogEntry.objects.update(
+        changed_at=timezone.now() - timedelta(
+            days=settings.BLOG_CHANGELOG_RETENTION_DAYS + 1
+        )
+    )
+    recent_id = recent.id
+    recent.delete()
+    call_command(
+        "export_blog", str(tmp_path), watermark=tmp_path / "watermark.json",
+        stdout=StringIO(),
+    )
+    assert list(
+        ChangeLogEntry.objects.values_list("object_id", flat=True)
+    ) == [recent_id], (
+        "Убедитесь, что `export_blog --watermark` удаляет записи журнала"
+        " изменений старше BLOG_CHANGELOG_RETENTION_DAYS."
+    )
@@ -0,0 +1,66 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    counts = [q for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+    return response, len(counts)
+
+
+def test_feed_count_is_cached_until_posts_change(
+    mixer, user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    category = posts[0].category
+    for url in ("/", f"/category/{category.slug}/"):
+        _, n_counts = count_queries(user_client, url)
+        assert n_counts == 1
+        response, n_counts = count_queries(user_client, url)
+        assert n_counts == 0, (
+            "Убедитесь, что количество публикаций ленты берётся из кеша,"
+            " пока публикации не менялись."
+        )
+        n_pages = response.context["page_obj"].paginator.num_pages
+
+        new_post = mixer.blend(
+            "blog.Post",
+            category=category,
+            location=posts[0].location,
+            pub_date=posts[0].pub_date,
+        )
+        response, n_counts = count_queries(user_client, url)
+        assert n_counts == 1, (
+            "Убедитесь, что кеш количества публикаций сбрасывается при"
+            " сохранении публикации."
+        )
+        assert response.context["page_obj"].paginator.count == len(posts) + 1
+        assert response.context["page_obj"].paginator.num_pages == n_pages + 1
+
+        new_post.delete()
+        response, _ = count_queries(user_client, url)
+        assert response.context["page_obj"].paginator.count == len(posts)
+
+
+def test_profile_count_scopes(
+    user_client, another_user_client, user, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    url = f"/profile/{user.username}/"
+    user_client.get(url)
+    another_user_client.get(url)
+
+    posts[0].is_published = False
+    posts[0].save()
+
+    owner_page = user_client.get(url).context["page_obj"]
+    public_page = another_user_client.get(url).context["page_obj"]
+    assert owner_page.paginator.count == len(posts)
+    assert public_page.paginator.count == len(posts) - 1, (
+        "Убедитесь, что снятие поста с публикации сбрасывает кеш"
+        " количества публикаций в профиле автора."
+    )
@@ -0,0 +1,17 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_queries_use_indexes():
+    stdout = StringIO()
+    call_command("benchmark_feed_indexes", posts=2000, repeat=1, stdout=stdout)
+    output = stdout.getvalue()
+    for feed in ("index", "category", "profile"):
+        assert f"{feed}: post_" in output, (
+            f"Убедитесь, что запрос ленты `{feed}` использует индекс модели"
+            " Post."
+        )
@@ -0,0 +1,89 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.management import call_command
+from PIL import Image
+
+from blog.jobs import TASKS, enqueue
+from blog.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_jobs():
+    call_command("run_jobs", workers=0, burst=True, stdout=StringIO())
+
+
+@pytest.fixture
+def failing_task():
+    def fail(**payload):
+        raise RuntimeError("сбой задачи")
+
+    TASKS["tests.fail"] = fail
+    yield "tests.fail"
+    del TASKS["tests.fail"]
+
+
+def test_post_image_upload_is_queued(
+    user_client, published_category, PostModel
+):
+    img_io = BytesIO()
+    Image.new("RGB", (800, 600)).save(img_io, format="JPEG")
+    img_io.name = "queued.jpg"
+    img_io.seek(0)
+    user_client.post(
+        "/posts/create/",
+        data={
+            "title": "Пост с фото",
+            "text": "Текст",
+            "category": published_category.id,
+            "pub_date": "2020-01-01T00:00",
+            "is_published": True,
+            "image": img_io,
+        },
+    )
+    post = PostModel.objects.get(title="Пост с фото")
+    job = Job.objects.get()
+    assert job.task == "blog.generate_image_derivatives"
+    assert job.payload == {"post_id": post.id}
+    assert post.image_derivatives == {}, (
+        "Убедитесь, что обработка фото не выполняется в самом запросе."
+    )
+
+    run_jobs()
+    job.refresh_from_db()
+    post.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert post.image_derivatives["source"] == post.image.name
+
+
+def test_failed_job_is_retried_then_failed(failing_task):
+    job = enqueue(failing_task)
+    job.max_attempts = 2
+    job.save()
+
+    run_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.Status.PENDING
+    assert job.attempts == 1
+    assert "сбой задачи" in job.last_error
+
+    Job.objects.filter(pk=job.pk).update(run_after=job.created_at)
+    run_jobs()
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED
+    assert job.attempts == 2
+
+
+def test_enqueue_unknown_task():
+    with pytest.raises(KeyError):
+        enqueue("tests.unknown")
+
+
+def test_run_jobs_in_worker_processes(prod_manage):
+    # Дочерним процессам нужна база в файле, а не тестовая в памяти.
+    output = prod_manage("run_jobs", "--workers=2", "--benchmark=20")
+    assert "Выполнено задач: 20" in output and "done: 20" in output, (
+        "Убедитесь, что задачи выполняются в пуле процессов и родитель"
+        " сохраняет их статусы."
+    )
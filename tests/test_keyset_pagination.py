@@ -0,0 +1,69 @@
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_feed(
+    user_client, many_posts_with_published_locations
+):
+    posts = many_posts_with_published_locations
+    expected = sorted(
+        posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+
+    seen = []
+    cursors = []
+    url = "/"
+    while url:
+        page_obj = user_client.get(url).context["page_obj"]
+        assert len(page_obj) <= N_PER_PAGE, (
+            "Убедитесь, что курсорная пагинация выводит не больше"
+            f" {N_PER_PAGE} публикаций на странице."
+        )
+        seen.extend(page_obj)
+        cursors.append(page_obj.previous_cursor)
+        url = (
+            f"/?cursor={page_obj.next_cursor}"
+            if page_obj.has_next() else None
+        )
+
+    assert [post.id for post in seen] == [post.id for post in expected], (
+        "Убедитесь, что курсорная пагинация обходит ленту «от новых к"
+        " старым» без пропусков и повторов."
+    )
+
+    previous_page = user_client.get(f"/?cursor={cursors[-1]}").context[
+        "page_obj"
+    ]
+    assert [post.id for post in previous_page] == [
+        post.id for post in expected[:N_PER_PAGE]
+    ], "Убедитесь, что курсор предыдущей страницы возвращает на неё."
+    assert not previous_page.has_previous()
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_invalid_cursor(
+    user_client, many_posts_with_published_locations
+):
+    response = user_client.get("/?cursor=not-a-cursor")
+    assert response.status_code == 200
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+
+
+@pytest.mark.parametrize("page, expected", (("abc", 1), ("999", 2)))
+def test_page_number_is_clamped(
+    client, many_posts_with_published_locations, page, expected
+):
+    response = client.get(f"/?page={page}")
+    assert response.status_code == 200, (
+        "Убедитесь, что неверный номер страницы ленты не приводит к"
+        " ошибке 404."
+    )
+    assert response.context["page_obj"].number == expected, (
+        "Убедитесь, что нечисловой номер страницы показывает первую"
+        " страницу, а номер за концом ленты — последнюю."
+    )
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.schedule import get_cache_timeout, get_next_pub_date
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_cached(
+    client, django_assert_num_queries, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        "/pages/about/",
+    )
+    for url in urls:
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            "Убедитесь, что страница для анонимного посетителя отдаётся из"
+            " кеша."
+        )
+
+
+def test_authenticated_pages_are_not_cached(
+    user_client, post_with_published_location
+):
+    user_client.get("/")
+    response = user_client.get("/")
+    assert "Написать пост" in response.content.decode()
+    assert response.context is not None, (
+        "Убедитесь, что страницы для авторизованных пользователей не"
+        " берутся из кеша."
+    )
+
+
+def test_anonymous_cache_invalidation(
+    client, mixer, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    client.get("/")
+    client.get(detail_url)
+
+    mixer.blend(CommentModel, post=post, text="Свежий комментарий")
+    assert "Свежий комментарий" in client.get(detail_url).content.decode(), (
+        "Убедитесь, что кеш страницы поста сбрасывается при добавлении"
+        " комментария."
+    )
+
+    post.category.is_published = False
+    post.category.save()
+    assert post.title not in client.get("/").content.decode(), (
+        "Убедитесь, что кеш ленты сбрасывается при снятии категории с"
+        " публикации."
+    )
+
+
+def test_cache_timeout_follows_scheduled_post(mixer, user):
+    default = settings.BLOG_PAGE_CACHE_TIMEOUT
+    assert get_next_pub_date() is None
+    assert get_cache_timeout(default) == default
+
+    pub_date = timezone.now() + timedelta(seconds=30)
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True, pub_date=pub_date
+    )
+    assert get_next_pub_date() == pub_date, (
+        "Убедитесь, что дата ближайшей отложенной публикации обновляется"
+        " при сохранении поста."
+    )
+    assert 0 < get_cache_timeout(default) <= 30, (
+        "Убедитесь, что кеш лент истекает к дате ближайшей отложенной"
+        " публикации."
+    )
+
+    post.delete()
+    assert get_cache_timeout(default) == default
+
+
+@pytest.mark.parametrize("delay", (None, timedelta(days=30)))
+def test_next_pub_date_cache_expires(mixer, user, delay):
+    if delay is not None:
+        mixer.blend(
+            "blog.Post", author=user, is_published=True,
+            pub_date=timezone.now() + delay,
+        )
+    with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+        get_next_pub_date()
+    timeout = cache_set.call_args.args[2]
+    assert timeout is not None, (
+        "Убедитесь, что дата ближайшей отложенной публикации хранится в"
+        " кеше ограниченное время: посты, добавленные в обход сигналов,"
+        " не сбрасывают её."
+    )
+    assert timeout <= settings.BLOG_FEED_COUNT_TIMEOUT
+
+
+def test_cascade_delete_skips_per_comment_work(
+    mixer, user, another_user, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    other_post = mixer.blend(type(post), category=post.category)
+    mixer.cycle(50).blend(CommentModel, post=post)
+    mixer.cycle(20).blend(CommentModel, post=other_post, author=user)
+    for instance in (post, user):
+        with CaptureQueriesContext(connection) as queries:
+            instance.delete()
+        sql = [
+            query["sql"] for query in queries
+            if "blog_changelogentry" not in query["sql"]
+        ]
+        assert len(sql) < 15, (
+            "Убедитесь, что при каскадном удалении комментариев сигналы"
+            " не делают запросов на каждый комментарий."
+        )
+    other_post.refresh_from_db()
+    assert other_post.comment_count == 0
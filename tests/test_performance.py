@@ -0,0 +1,83 @@
+import logging
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+from blog.performance import get_report
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def monitored_client(settings):
+    settings.BLOG_PERFORMANCE_MONITORING = True
+    return Client()
+
+
+def test_middleware_aggregates_per_view(
+    monitored_client, post_with_published_location
+):
+    for _ in range(2):
+        monitored_client.get("/")
+    monitored_client.get(f"/posts/{post_with_published_location.id}/")
+
+    report = {row["view"]: row for row in get_report()}
+    assert set(report) == {"blog:index", "blog:post_detail"}, (
+        "Убедитесь, что замеры группируются по имени URL."
+    )
+    index = report["blog:index"]
+    assert index["count"] == 2
+    assert index["queries_max"] > 0 and index["size_avg"] > 0
+    assert report["blog:post_detail"]["render_time_avg"] > 0, (
+        "Убедитесь, что в замер попадает время рендеринга шаблонов."
+    )
+
+
+def test_report_is_shared_between_processes(monitored_client):
+    monitored_client.get("/")
+    cache.clear()
+    assert [row["view"] for row in get_report()] == ["blog:index"], (
+        "Убедитесь, что сводка хранится не в кеше процесса, а там, где"
+        " её видят все процессы сервера и `performance_report`."
+    )
+
+
+def test_budget_violation_is_logged(
+    monitored_client, post_with_published_location, caplog
+):
+    with override_settings(BLOG_PERFORMANCE_BUDGETS={"default": {
+        "queries": 0
+    }}):
+        with caplog.at_level(logging.WARNING, logger="blog.performance"):
+            monitored_client.get("/")
+    assert "blog:index" in caplog.text, (
+        "Убедитесь, что превышение бюджета записывается в лог"
+        " `blog.performance`."
+    )
+    assert get_report()[0]["over_budget"] == 1
+
+
+def test_report_command_and_admin_page(monitored_client, user, user_client):
+    monitored_client.get("/")
+    out = StringIO()
+    call_command("performance_report", "--reset", stdout=out)
+    assert "blog:index" in out.getvalue()
+    assert get_report() == [], (
+        "Убедитесь, что `performance_report --reset` очищает сводку."
+    )
+
+    assert user_client.get("/admin/performance/").status_code == 302, (
+        "Убедитесь, что страница отчёта доступна только персоналу."
+    )
+    user.is_staff = True
+    user.save()
+    response = user_client.get("/admin/performance/")
+    assert response.status_code == 200
+
+
+def test_monitoring_disabled_by_default(client):
+    client.get("/")
+    assert get_report() == []
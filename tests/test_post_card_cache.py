@@ -0,0 +1,93 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.performance import install_template_timer, measure
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_fragment_is_reused_and_versioned(
+    user_client, another_user_client, post_with_published_location,
+    PostModel
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    # Обход auto_now: версия карточки не меняется, значит берётся кеш.
+    PostModel.objects.filter(pk=post.pk).update(title="Скрытая правка")
+    for client, url in (
+        (another_user_client, "/"),
+        (user_client, f"/category/{post.category.slug}/"),
+    ):
+        content = client.get(url).content.decode()
+        assert post.title in content, (
+            "Убедитесь, что отрисованная карточка поста кешируется и"
+            " переиспользуется на разных лентах."
+        )
+
+    post.location.name = "Новое место"
+    post.location.save()
+    content = user_client.get("/").content.decode()
+    assert "Новое место" in content and "Скрытая правка" in content, (
+        "Убедитесь, что кеш карточки сбрасывается при изменении"
+        " местоположения поста."
+    )
+
+    post.refresh_from_db()
+    post.title = "Обычная правка"
+    post.save()
+    assert "Обычная правка" in user_client.get("/").content.decode(), (
+        "Убедитесь, что кеш карточки сбрасывается при изменении поста."
+    )
+
+
+def test_feed_cards_are_rendered_in_one_pass(
+    user_client, many_posts_with_published_locations
+):
+    install_template_timer()
+    with measure() as metrics:
+        response = user_client.get("/")
+    content = response.content.decode()
+    page = response.context["page_obj"]
+    for post in page:
+        assert f'href="/posts/{post.id}/"' in content
+        assert f'href="/category/{post.category.slug}/"' in content
+        assert f'href="/profile/{post.author.username}/"' in content
+    profile = {name: calls for name, calls, *_ in metrics.template_profile()}
+    assert profile["includes/post_card.html"] == len(page)
+    assert "includes/category_link.html" not in profile, (
+        "Убедитесь, что ссылка на категорию в карточке не подключается"
+        " отдельным {% include %}."
+    )
+
+    with measure() as metrics:
+        content = user_client.get("/").content.decode()
+    assert all(post.title in content for post in page)
+    assert "includes/post_card.html" not in {
+        name for name, *_ in metrics.template_profile()
+    }, "Убедитесь, что готовые карточки берутся из кеша."
+
+
+def test_benchmark_post_cards(post_with_published_location):
+    out = StringIO()
+    call_command("benchmark_post_cards", iterations=2, stdout=out)
+    output = out.getvalue()
+    assert "include:cold" in output and "post_cards:warm" in output
+
+
+def test_post_without_category_has_no_category_link(
+    user_client, post_with_published_location, PostModel
+):
+    post = post_with_published_location
+    PostModel.objects.filter(pk=post.pk).update(category=None)
+    for url in (f"/profile/{post.author.username}/", f"/posts/{post.id}/"):
+        response = user_client.get(url)
+        assert response.status_code == 200, url
+        content = response.content.decode()
+        assert 'href="None"' not in content and "без категории" in content, (
+            "Убедитесь, что у поста без категории категория выводится"
+            " текстом, без ссылки."
+        )
+        assert "категория снята с публикации" not in content
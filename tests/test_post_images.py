@@ -0,0 +1,69 @@
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.jobs import enqueue
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(width, height):
+    img_io = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        img_io, format="JPEG"
+    )
+    return ImageFile(img_io, name="wide_image.jpg")
+
+
+@pytest.fixture
+def post_with_wide_image(
+    mixer, user, published_location, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        location=published_location,
+        category=published_category,
+        author=user,
+        image=make_image(1500, 1000),
+    )
+    enqueue("blog.generate_image_derivatives", post_id=post.id)
+    call_command("run_jobs", workers=0, burst=True, stdout=StringIO())
+    return post
+
+
+def test_derivatives_created(user_client, post_with_wide_image):
+    post = post_with_wide_image
+    post.refresh_from_db()
+    derivatives = post.image_derivatives
+    assert derivatives["source"] == post.image.name
+    widths = {(v["width"], v["format"]) for v in derivatives["files"]}
+    assert widths == {
+        (320, "jpeg"), (640, "jpeg"), (1280, "jpeg"),
+        (320, "webp"), (640, "webp"), (1280, "webp"), (1500, "webp"),
+    }, "Убедитесь, что при загрузке фото создаются уменьшенные копии."
+    storage = post.image.storage
+    for variant in derivatives["files"]:
+        with storage.open(variant["name"]) as f:
+            assert Image.open(f).width == variant["width"]
+
+    for url in ("/", f"/posts/{post.id}/"):
+        soup = BeautifulSoup(user_client.get(url).content, "html.parser")
+        assert soup.find("source", type="image/webp")["srcset"]
+        assert "320w" in soup.find("img", src=post.image.url)["srcset"], (
+            "Убедитесь, что фото публикации выводится с атрибутом srcset."
+        )
+
+
+def test_backfill_post_images(post_with_wide_image, PostModel):
+    post = post_with_wide_image
+    PostModel.objects.filter(pk=post.pk).update(image_derivatives={})
+    call_command("backfill_post_images", workers=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_derivatives.get("source") == post.image.name, (
+        "Убедитесь, что команда `backfill_post_images` создаёт копии для"
+        " уже загруженных фото."
+    )
@@ -0,0 +1,98 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def replica(tmp_path, post_with_published_location):
+    """
+    Реплика — отдельный файл SQLite, снятый с основной базы до
+    появления в ней новых данных.
+    """
+    path = tmp_path / "replica.sqlite3"
+    with connections["default"].cursor() as cursor:
+        cursor.execute("VACUUM INTO %s", [str(path)])
+    connections.settings["replica"] = connections.configure_settings({
+        "default": connections.settings["default"],
+        "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": path},
+    })["replica"]
+    # Тестовый класс pytest-django не знает о реплике и запрещает
+    # ей ensure_connection, поэтому соединяемся заранее.
+    connections["replica"].connect()
+    yield "replica"
+    connections["replica"].close()
+    del connections["replica"]
+    del connections.settings["replica"]
+
+
+def test_feeds_and_detail_read_from_replica(
+    replica, client, user_client, post_with_published_location, mixer,
+):
+    post = post_with_published_location
+    assert client.get(f"/posts/{post.id}/").status_code == 200
+    assert client.get("/").context["page_obj"].paginator.count == 1
+
+    fresh = mixer.blend(
+        Post, is_published=True, category=post.category,
+        author=post.author, location=None,
+    )
+    assert Post.objects.using(replica).filter(pk=fresh.pk).count() == 0
+    assert client.get(f"/posts/{fresh.id}/").status_code == 404, (
+        "Убедитесь, что страница поста читает данные с реплики."
+    )
+    response = client.get(f"/category/{post.category.slug}/")
+    assert len(response.context["page_obj"]) == 1, (
+        "Убедитесь, что лента категории читает данные с реплики."
+    )
+    response = client.get(f"/profile/{post.author.username}/")
+    assert len(response.context["page_obj"]) == 1, (
+        "Убедитесь, что профиль читает данные с реплики."
+    )
+
+
+def test_author_reads_own_writes_from_primary(
+    replica, user_client, post_with_published_location,
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Свежий комментарий"}
+    )
+    assert response.status_code == 302
+    response = user_client.get(f"/posts/{post.id}/")
+    assert "Свежий комментарий" in response.content.decode(), (
+        "Убедитесь, что после записи автор читает с основной базы и"
+        " видит свой комментарий, даже если реплика отстаёт."
+    )
+
+
+def test_lagging_replica_pages_are_not_cached(
+    replica, client, post_with_published_location, mixer,
+):
+    post = post_with_published_location
+    fresh = mixer.blend(
+        Post, is_published=True, category=post.category,
+        author=post.author, location=None,
+    )
+    assert fresh.title not in client.get("/").content.decode()
+    with CaptureQueriesContext(connections[replica]) as queries:
+        client.get("/")
+    assert queries, (
+        "Убедитесь, что страница, прочитанная с реплики сразу после"
+        " изменения данных, не попадает в кеш: реплика могла отставать."
+    )
+
+
+def test_session_user_is_loaded_from_primary(replica, mixer):
+    user = mixer.blend(get_user_model())
+    client = Client()
+    client.force_login(user)
+    assert user.username in client.get("/").content.decode(), (
+        "Убедитесь, что пользователь сессии загружается с основной базы:"
+        " на реплике его может ещё не быть."
+    )
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user):
+    now = timezone.now()
+
+    def make(title, text, days_ago=1, **kwargs):
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user,
+            pub_date=now - timedelta(days=days_ago),
+            is_published=kwargs.pop("is_published", True),
+            category__is_published=True, **kwargs,
+        )
+
+    return {
+        "title": make("Прогулки по Москве", "Обычный день."),
+        "text": make("Заметка", "Вчера была долгая прогулка в парке."),
+        "old": make("Прогулка", "Давняя история.", days_ago=3000),
+        "hidden": make("Прогулка", "Скрытая.", is_published=False),
+        "future": make("Прогулка", "Отложенная.", days_ago=-10),
+        "other": make("Обед", "Ничего общего."),
+    }
+
+
+def search_ids(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_stems_and_ranks(client, posts):
+    ids = search_ids(client, "прогулками")
+    assert set(ids) == {
+        posts["title"].id, posts["text"].id, posts["old"].id
+    }, (
+        "Убедитесь, что поиск находит словоформы и соблюдает правила"
+        " публикации из `get_base_queryset`."
+    )
+    assert ids[0] == posts["title"].id, (
+        "Убедитесь, что совпадение в заголовке ранжируется выше."
+    )
+    assert ids.index(posts["title"].id) < ids.index(posts["old"].id), (
+        "Убедитесь, что при равной релевантности свежий пост выше."
+    )
+
+
+def test_search_index_follows_edits(client, posts):
+    post = posts["other"]
+    post.text = "Неожиданная прогулка после обеда."
+    post.save()
+    assert post.id in search_ids(client, "прогулка")
+
+    Post.objects.filter(pk=post.id).delete()
+    assert post.id not in search_ids(client, "прогулка")
+
+
+def test_search_ignores_fts_syntax(client, posts):
+    assert search_ids(client, 'прогулка"(*') != []
+    assert search_ids(client, "***") == []
+
+
+def test_rebuild_search_index(client, posts):
+    Post.objects.filter(pk=posts["other"].id).update(title="Прогулка")
+    assert posts["other"].id not in search_ids(client, "прогулка")
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert posts["other"].id in search_ids(client, "прогулка"), (
+        "Убедитесь, что `rebuild_search_index` индексирует посты,"
+        " изменённые в обход сигналов."
+    )
@@ -0,0 +1,50 @@
+import importlib
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.performance import install_template_timer, measure
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_profile_counts_each_template_and_include(
+    user_client, many_posts_with_published_locations
+):
+    install_template_timer()
+    with measure() as metrics:
+        response = user_client.get("/")
+    profile = {
+        name: (calls, total, own)
+        for name, calls, total, own in metrics.template_profile()
+    }
+    cards = len(response.context["page_obj"])
+    assert profile["includes/post_card.html"][0] == cards, (
+        "Убедитесь, что профиль считает каждый вызов {% include %}."
+    )
+    assert profile["base.html"][0] == 1
+    assert profile["blog/index.html"][1] == pytest.approx(
+        metrics.render_time
+    ), "Время шаблона вида должно совпадать со временем рендеринга."
+    assert all(own <= total for _, total, own in profile.values())
+    assert sum(own for _, _, own in profile.values()) == pytest.approx(
+        metrics.render_time
+    ), "Собственное время шаблонов должно складываться во время страницы."
+
+
+def test_prod_settings_use_cached_loader():
+    prod = importlib.import_module("blogicum.settings_prod")
+    options = prod.TEMPLATES[0]["OPTIONS"]
+    assert options["loaders"][0][0] == (
+        "django.template.loaders.cached.Loader"
+    ), "Убедитесь, что в продакшене шаблоны компилируются один раз."
+    assert not prod.TEMPLATES[0]["APP_DIRS"]
+
+
+def test_profile_templates_command(user, post_with_published_location):
+    out = StringIO()
+    call_command("profile_templates", requests=2, warmup=1, stdout=out)
+    output = out.getvalue()
+    assert "blog/index.html" in output
+    assert "Рендеринг страницы" in output
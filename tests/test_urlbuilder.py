@@ -0,0 +1,56 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template import Context, Template
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+
+from blog.urlbuilder import build_url, get_url_builder
+
+
+@pytest.mark.parametrize("viewname, args", [
+    ("blog:index", []),
+    ("blog:post_detail", [42]),
+    ("blog:category_posts", ["travel-notes"]),
+    ("blog:profile", ["user.name+tag@example"]),
+    ("blog:profile", ["Пользователь"]),
+    ("blog:profile", ["with space"]),
+    ("blog:edit_comment", [7, 13]),
+])
+def test_build_url_matches_reverse(viewname, args):
+    assert build_url(viewname, *args) == reverse(viewname, args=args), (
+        "Убедитесь, что build_url собирает тот же URL, что и reverse()."
+    )
+
+
+def test_build_url_respects_script_prefix():
+    set_script_prefix("/blog/")
+    try:
+        assert build_url("blog:post_detail", 1) == "/blog/posts/1/"
+    finally:
+        set_script_prefix("/")
+    assert build_url("blog:post_detail", 1) == "/posts/1/"
+
+
+def test_invalid_values_are_rejected_like_reverse():
+    build = get_url_builder("blog:category_posts")
+    for value in ("", "a/b"):
+        with pytest.raises(NoReverseMatch):
+            build(value)
+
+
+def test_build_url_tag():
+    template = Template(
+        "{% load blog_tags %}"
+        "{% for pk in ids %}{% build_url 'blog:post_detail' pk %} "
+        "{% endfor %}"
+    )
+    assert template.render(Context({"ids": [1, 2]})) == (
+        "/posts/1/ /posts/2/ "
+    )
+
+
+def test_benchmark_urls():
+    out = StringIO()
+    call_command("benchmark_urls", cards=10, stdout=out)
+    assert "get_url_builder" in out.getvalue()